@@ -0,0 +1,120 @@
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Permite executar tanto com `python -m benchmarks.check_model_quality` quanto com `python benchmarks/check_model_quality.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from utils.model_quality_utils import ModelQualityEngine
+
+# Pares previsão/rótulo da janela usada nas verificações (acima do `min_count` padrão de `violations`)
+N_RECORDS = 2000
+
+
+def check(condition, message):
+    """
+    Falha a verificação com uma mensagem (independente de `assert`, que é removido com `python -O`).
+    """
+    if not condition:
+        raise AssertionError(message)
+
+
+def window_engine(rng):
+    """
+    Cria um motor com uma única janela de uma hora com todos os rótulos já juntados às previsões.
+    """
+    label = rng.integers(0, 2, N_RECORDS)
+    probability = np.clip(0.3 * label + rng.normal(0.35, 0.2, N_RECORDS), 0, 1)
+    ids = [f"id-{i}" for i in range(N_RECORDS)]
+    times = pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 3600, N_RECORDS), unit="s")
+
+    engine = ModelQualityEngine(window="1h")
+    engine.add_predictions(pd.DataFrame({"inference_id": ids, "inference_time": times, "probability": probability}))
+    engine.add_ground_truth(pd.DataFrame({"inference_id": ids, "label": label}))
+    check(len(engine.aggregates) == 1 and not len(engine.pending_predictions), "Esperada uma única janela sem pendentes")
+    return engine
+
+
+def violated_metrics(engine, baseline):
+    engine.baseline = baseline
+    return {v["metric_name"]: v["constraint_check_type"] for v in engine.violations()}
+
+
+def check_better_true_positive_rate(rng):
+    """
+    Uma janela com taxa de verdadeiros positivos maior que a da linha de base não gera violações.
+    """
+    engine = window_engine(rng)
+    metrics = engine.window_metrics().iloc[0].to_dict()
+    baseline = {**metrics, "true_positive_rate": metrics["true_positive_rate"] - 0.2, "recall": metrics["recall"] - 0.2}
+    violations = violated_metrics(engine, baseline)
+    check(not violations, f"Nenhuma violação esperada com a linha de base pior, obtidas {violations}")
+
+
+def check_worse_true_positive_rate(rng):
+    """
+    Uma queda na taxa de verdadeiros positivos é apontada como LessThanThreshold, igual ao recall.
+    """
+    engine = window_engine(rng)
+    metrics = engine.window_metrics().iloc[0].to_dict()
+    baseline = {**metrics, "true_positive_rate": metrics["true_positive_rate"] + 0.2, "recall": metrics["recall"] + 0.2}
+    expected = {"true_positive_rate": "LessThanThreshold", "recall": "LessThanThreshold"}
+    violations = violated_metrics(engine, baseline)
+    check(violations == expected, f"Esperadas {expected}, obtidas {violations}")
+
+
+def check_worse_false_positive_rate(rng):
+    """
+    Na taxa de falsos positivos, menores valores são melhores: um aumento é apontado como GreaterThanThreshold.
+    """
+    engine = window_engine(rng)
+    metrics = engine.window_metrics().iloc[0].to_dict()
+    baseline = {**metrics, "false_positive_rate": metrics["false_positive_rate"] - 0.2}
+    expected = {"false_positive_rate": "GreaterThanThreshold"}
+    violations = violated_metrics(engine, baseline)
+    check(violations == expected, f"Esperadas {expected}, obtidas {violations}")
+
+
+CHECKS = [
+    check_better_true_positive_rate,
+    check_worse_true_positive_rate,
+    check_worse_false_positive_rate,
+]
+
+
+def run_checks(seed=1729):
+    """
+    Executa as verificações da comparação com a linha de base de `utils/model_quality_utils.py`.
+
+    Returns:
+        int: Número de verificações que falharam.
+    """
+    rng = np.random.default_rng(seed)
+    failures = 0
+    for check_fn in CHECKS:
+        try:
+            check_fn(rng)
+            print(f"ok    {check_fn.__name__}")
+        except Exception as e:
+            failures += 1
+            print(f"FALHA {check_fn.__name__}: {type(e).__name__}: {e}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica as violações de qualidade do modelo de utils/model_quality_utils.py")
+    parser.add_argument("--seed", type=int, default=1729)
+    args = parser.parse_args(argv)
+
+    failures = run_checks(args.seed)
+    print(f"## {len(CHECKS) - failures}/{len(CHECKS)} verificações passaram")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import os
+import sys
+import errno
+import argparse
+
+import numpy as np
+
+# Permite executar tanto com `python -m benchmarks.check_storage_s3` quanto com `python benchmarks/check_storage_s3.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from utils import storage_utils
+
+BUCKET = "bench-storage"
+
+# Menor tamanho de parte aceito pelo S3: mantém os objetos de teste com várias partes sem usar muita memória
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def check(condition, message):
+    """
+    Falha a verificação com uma mensagem (independente de `assert`, que é removido com `python -O`).
+    """
+    if not condition:
+        raise AssertionError(message)
+
+
+def object_keys(client):
+    return [obj["Key"] for obj in client.list_objects_v2(Bucket=BUCKET).get("Contents", [])]
+
+
+def pending_uploads(client):
+    return client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", [])
+
+
+def check_multipart_round_trip(client, rng):
+    """
+    Escreve um objeto de várias partes em blocos de tamanhos que não coincidem com as partes e o lê de volta,
+    tanto com `open_uri` quanto com `download_file`.
+    """
+    data = rng.bytes(4 * MIN_PART_SIZE + 12_345)
+    uri = f"s3://{BUCKET}/round_trip.bin"
+    with storage_utils.open_uri(uri, "wb") as f:
+        for start in range(0, len(data), 3_000_001):
+            f.write(data[start:start + 3_000_001])
+
+    etag = client.head_object(Bucket=BUCKET, Key="round_trip.bin")["ETag"]
+    check(etag.strip('"').endswith("-5"), f"Esperado multipart upload com 5 partes, ETag {etag}")
+
+    with storage_utils.open_uri(uri) as f:
+        check(f.read() == data, "Conteúdo lido com open_uri difere do escrito")
+
+    path = os.path.join(os.environ.get("TMPDIR", "/tmp"), "check_storage_s3.bin")
+    try:
+        storage_utils.download_file(uri, path)
+        with open(path, "rb") as f:
+            check(f.read() == data, "Conteúdo baixado com download_file difere do escrito")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def check_seek(client, rng):
+    """
+    Posiciona o leitor em pontos arbitrários (inclusive para trás e a partir do fim) e confere os bytes lidos;
+    `np.load` usa `seek` e `readinto` para ler o cabeçalho e os dados do .npy.
+    """
+    data = rng.bytes(2 * MIN_PART_SIZE + 999)
+    uri = f"s3://{BUCKET}/seek.bin"
+    with storage_utils.open_uri(uri, "wb") as f:
+        f.write(data)
+
+    with storage_utils.open_uri(uri) as f:
+        for offset in [MIN_PART_SIZE + 17, 3, len(data) - 10, 0]:
+            f.seek(offset)
+            check(f.read(100) == data[offset:offset + 100], f"Leitura após seek({offset}) difere")
+        f.seek(-50, os.SEEK_END)
+        check(f.read() == data[-50:], "Leitura após seek a partir do fim difere")
+        check(f.read() == b"", "Leitura no fim do objeto deveria ser vazia")
+
+    array = rng.random(500_000)
+    uri = f"s3://{BUCKET}/array.npy"
+    with storage_utils.open_uri(uri, "wb") as f:
+        np.save(f, array)
+    with storage_utils.open_uri(uri) as f:
+        check(np.array_equal(np.load(f), array), "Array lido com np.load difere do escrito")
+
+
+def check_abort(client, rng):
+    """
+    Uma exceção dentro do bloco `with` não cria o objeto nem deixa multipart uploads pendentes, tanto
+    depois de partes já enviadas quanto antes da primeira.
+    """
+    for key, size in [("abort_multipart.bin", 2 * MIN_PART_SIZE + 1), ("abort_small.bin", 1000)]:
+        try:
+            with storage_utils.open_uri(f"s3://{BUCKET}/{key}", "wb") as f:
+                f.write(rng.bytes(size))
+                raise RuntimeError("falha simulada")
+        except RuntimeError:
+            pass
+        check(key not in object_keys(client), f"{key} não deveria existir após o abort")
+    check(not pending_uploads(client), "Multipart uploads pendentes após o abort")
+
+
+def check_failed_flush(client, rng):
+    """
+    Uma falha no flush final (dentro do `close`, depois do bloco `with`) também não publica um objeto truncado.
+    """
+    key = "failed_flush.bin"
+    create_multipart_upload = client.create_multipart_upload
+
+    def fail(**kwargs):
+        raise OSError(errno.ENOSPC, "falha simulada")
+
+    client.create_multipart_upload = fail
+    # Partes menores que o buffer, para que o flush do `close` tente iniciar o multipart upload
+    part_size, storage_utils.PART_SIZE = storage_utils.PART_SIZE, storage_utils.BUFFER_SIZE // 4
+    try:
+        with storage_utils.open_uri(f"s3://{BUCKET}/{key}", "wb") as f:
+            # Menor que o buffer: os dados só chegam ao escritor S3 no flush do `close`
+            f.write(rng.bytes(storage_utils.BUFFER_SIZE // 2))
+        raise AssertionError("A falha no flush final deveria ser propagada")
+    except OSError:
+        pass
+    finally:
+        client.create_multipart_upload = create_multipart_upload
+        storage_utils.PART_SIZE = part_size
+    check(key not in object_keys(client), f"{key} não deveria existir após a falha no flush")
+    check(not pending_uploads(client), "Multipart uploads pendentes após a falha no flush")
+
+
+def check_empty_object(client, rng):
+    """
+    Um bloco `with` sem escritas cria um objeto vazio, que é lido como zero bytes.
+    """
+    uri = f"s3://{BUCKET}/empty.bin"
+    with storage_utils.open_uri(uri, "wb"):
+        pass
+    check(client.head_object(Bucket=BUCKET, Key="empty.bin")["ContentLength"] == 0, "Objeto vazio com tamanho != 0")
+
+    with storage_utils.open_uri(uri) as f:
+        check(f.read() == b"", "Leitura do objeto vazio deveria ser vazia")
+
+    reader = storage_utils.S3RangeReader(uri)
+    try:
+        check(reader.size == 0 and reader.readinto(bytearray(10)) == 0, "S3RangeReader deveria ler zero bytes")
+    finally:
+        reader.close()
+
+
+def check_list_shards(client, rng):
+    """
+    `list_shards` lista somente os arquivos com o sufixo sob o prefixo, em ordem.
+    """
+    for name in ["part-1.csv", "part-0.csv", "_SUCCESS"]:
+        with storage_utils.open_uri(f"s3://{BUCKET}/shards/{name}", "w") as f:
+            f.write("a,b\n1,2\n")
+
+    shards = storage_utils.list_shards(f"s3://{BUCKET}/shards/")
+    expected = [f"s3://{BUCKET}/shards/part-0.csv", f"s3://{BUCKET}/shards/part-1.csv"]
+    check(shards == expected, f"list_shards retornou {shards}")
+
+
+CHECKS = [
+    check_multipart_round_trip,
+    check_seek,
+    check_abort,
+    check_failed_flush,
+    check_empty_object,
+    check_list_shards,
+]
+
+
+def run_checks(seed=1729):
+    """
+    Executa as verificações da camada S3 de `utils/storage_utils.py` contra um S3 simulado com o moto.
+
+    Returns:
+        int: Número de verificações que falharam.
+    """
+    from moto import mock_aws
+
+    # Credenciais e região fictícias: nenhuma requisição sai do processo
+    for name, value in [("AWS_DEFAULT_REGION", "us-east-1"), ("AWS_ACCESS_KEY_ID", "testing"),
+                        ("AWS_SECRET_ACCESS_KEY", "testing")]:
+        os.environ[name] = value
+    os.environ.pop("AWS_PROFILE", None)
+
+    part_size = storage_utils.PART_SIZE
+    storage_utils.PART_SIZE = MIN_PART_SIZE
+    failures = 0
+    try:
+        with mock_aws():
+            # O cliente compartilhado é criado aqui, dentro do mock
+            client = storage_utils.get_s3_client()
+            client.create_bucket(Bucket=BUCKET)
+            rng = np.random.default_rng(seed)
+            for check_fn in CHECKS:
+                try:
+                    check_fn(client, rng)
+                    print(f"ok    {check_fn.__name__}")
+                except Exception as e:
+                    failures += 1
+                    print(f"FALHA {check_fn.__name__}: {type(e).__name__}: {e}")
+    finally:
+        storage_utils.PART_SIZE = part_size
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica a camada S3 de utils/storage_utils.py com o moto")
+    parser.add_argument("--seed", type=int, default=1729)
+    args = parser.parse_args(argv)
+
+    try:
+        import moto  # noqa: F401
+    except ImportError:
+        print("## moto não está instalado (pip install 'moto[s3]'); verificações do S3 ignoradas")
+        return 0
+
+    failures = run_checks(args.seed)
+    print(f"## {len(CHECKS) - failures}/{len(CHECKS)} verificações passaram")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import sys
+import json
+import argparse
+
+
+def load_results(path):
+    """
+    Carrega um arquivo de resultados e indexa as medições por (linhas, etapa).
+
+    Args:
+        path (str): Caminho do arquivo JSON gerado por run_benchmarks.
+
+    Returns:
+        tuple: (dados completos do arquivo, dicionário {(linhas, etapa): medição}).
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    return data, {(r["rows"], r["step"]): r for r in data["results"]}
+
+
+def compare(baseline_path, candidate_path):
+    """
+    Compara duas execuções de benchmark e retorna uma linha por etapa presente em ambas.
+
+    Args:
+        baseline_path (str): Resultados de referência (por exemplo, do commit anterior).
+        candidate_path (str): Resultados a comparar.
+
+    Returns:
+        list[dict]: Latência p50, pico de memória e as razões candidato/referência.
+    """
+    _, baseline = load_results(baseline_path)
+    _, candidate = load_results(candidate_path)
+
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        b, c = baseline[key], candidate[key]
+        rows.append({
+            "rows": key[0],
+            "step": key[1],
+            "p50_s": (b["latency_s"]["p50"], c["latency_s"]["p50"]),
+            "p50_ratio": c["latency_s"]["p50"] / b["latency_s"]["p50"] if b["latency_s"]["p50"] else None,
+            "peak_mb": (b["peak_traced_mb"], c["peak_traced_mb"]),
+            "peak_ratio": c["peak_traced_mb"] / b["peak_traced_mb"] if b["peak_traced_mb"] else None,
+        })
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dois arquivos de resultados de benchmark.")
+    parser.add_argument("baseline", help="JSON de referência")
+    parser.add_argument("candidate", help="JSON a comparar")
+    args = parser.parse_args(argv)
+
+    print(f"{'linhas':>12} {'etapa':<24} {'p50 ref (s)':>12} {'p50 novo (s)':>12} {'razão':>7} "
+          f"{'pico ref (MiB)':>15} {'pico novo (MiB)':>16} {'razão':>7}")
+    for r in compare(args.baseline, args.candidate):
+        print(
+            f"{r['rows']:>12} {r['step']:<24} {r['p50_s'][0]:>12.4f} {r['p50_s'][1]:>12.4f} "
+            f"{r['p50_ratio'] or 0:>7.2f} {r['peak_mb'][0]:>15.1f} {r['peak_mb'][1]:>16.1f} {r['peak_ratio'] or 0:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
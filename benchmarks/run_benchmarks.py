@@ -0,0 +1,464 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+import tracemalloc
+from time import gmtime, strftime
+
+import numpy as np
+
+# Permite executar tanto com `python -m benchmarks.run_benchmarks` quanto com `python benchmarks/run_benchmarks.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stand_ins import install_stand_ins, tracked
+from benchmarks.synthetic_data import get_dataset, get_model_quality_data
+
+TRACKING_URI = "file:///dev/null"  # Ignorado pelo MLflow substituto
+
+# Tamanho dos blocos lidos e escritos nas medições de streaming da etapa `storage`
+STORAGE_BLOCK_SIZE = 8 * 1024 * 1024
+
+def ensure_preprocessed(ctx):
+    """
+    Executa `preprocess` uma vez (fora da medição) para as etapas que dependem das suas saídas.
+
+    Args:
+        ctx (dict): Contexto da escala em execução.
+
+    Returns:
+        dict: Resultado retornado por `preprocess`.
+    """
+    if "preprocess_outputs" not in ctx:
+        from pipeline_steps.preprocess import preprocess
+
+        ctx["preprocess_outputs"] = preprocess(ctx["input_path"], ctx["output_prefix"], TRACKING_URI)
+
+    return ctx["preprocess_outputs"]
+
+
+def ensure_model(ctx):
+    """
+    Treina um modelo com `pipeline_steps.train` (fora da medição) e o publica no armazenamento local
+    (URI file://) no mesmo formato .tar.gz produzido pelo job de treinamento do SageMaker.
+
+    Args:
+        ctx (dict): Contexto da escala em execução.
+
+    Returns:
+        str: URI do artefato do modelo.
+    """
+    if "model_s3_uri" not in ctx:
+        from pipeline_steps.train import train
+
+        outputs = ensure_preprocessed(ctx)
+        ctx["model_s3_uri"] = train(
+            outputs["train_data"], outputs["validation_data"], f"file://{ctx['s3_root']}/{ctx['rows']}",
+            TRACKING_URI, hyperparameters={"verbosity": 0},
+        )["model_data"]
+
+    return ctx["model_s3_uri"]
+
+
+def step_preprocess(ctx):
+    from pipeline_steps.preprocess import preprocess
+
+    def run():
+        ctx["preprocess_outputs"] = preprocess(ctx["input_path"], ctx["output_prefix"], TRACKING_URI)
+        # Memória dos dados brutos e da matriz do modelo, registrada por preprocess no MLflow
+        return {
+            "items": ctx["rows"],
+            "metrics": {k: v for k, v in tracked["metrics"].items() if k.endswith("_memory_mb")},
+        }
+
+    return run
+
+
+def step_split(ctx):
+    import pandas as pd
+
+    # Reconstrói a matriz do modelo a partir das saídas do preprocess para medir somente a divisão
+    outputs = ensure_preprocessed(ctx)
+    test = pd.concat(
+        [pd.read_csv(outputs["test_y_data"], header=None), pd.read_csv(outputs["test_x_data"], header=None)],
+        axis=1, ignore_index=True,
+    )
+    df_model_data = pd.concat(
+        [pd.read_csv(outputs["train_data"], header=None), pd.read_csv(outputs["validation_data"], header=None), test],
+        ignore_index=True,
+    )
+    split_dir = os.path.join(ctx["workdir"], "split")
+    os.makedirs(split_dir, exist_ok=True)
+
+    def run():
+        # Mesma divisão e escrita realizadas em preprocess
+        train_data, validation_data, test_data = np.split(
+            df_model_data.sample(frac=1, random_state=1729),
+            [int(0.7 * len(df_model_data)), int(0.9 * len(df_model_data))],
+        )
+        train_data.to_csv(os.path.join(split_dir, "train.csv"), index=False, header=False)
+        validation_data.to_csv(os.path.join(split_dir, "validation.csv"), index=False, header=False)
+        test_data.to_csv(os.path.join(split_dir, "test.csv"), index=False, header=False)
+        return {"items": len(df_model_data)}
+
+    return run
+
+
+def step_train(ctx):
+    from pipeline_steps.train import train
+
+    outputs = ensure_preprocessed(ctx)
+    n_train = sum(1 for _ in open(outputs["train_data"]))
+
+    def run():
+        ctx["model_s3_uri"] = train(
+            outputs["train_data"], outputs["validation_data"], f"file://{ctx['s3_root']}/{ctx['rows']}",
+            TRACKING_URI, hyperparameters={"verbosity": 0},
+        )["model_data"]
+        return {"items": n_train}
+
+    return run
+
+
+def step_evaluate(ctx):
+    import matplotlib.pyplot as plt
+    from pipeline_steps.evaluate import evaluate
+
+    outputs = ensure_preprocessed(ctx)
+    model_s3_uri = ensure_model(ctx)
+    n_test = sum(1 for _ in open(outputs["test_y_data"]))
+
+    def run():
+        # evaluate grava o modelo e a curva ROC no diretório corrente
+        cwd = os.getcwd()
+        os.chdir(ctx["workdir"])
+        try:
+            evaluate(outputs["test_x_data"], outputs["test_y_data"], model_s3_uri, ctx["output_prefix"], TRACKING_URI)
+        finally:
+            os.chdir(cwd)
+            plt.close("all")
+        return {"items": n_test}
+
+    return run
+
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def step_record_preprocessor(ctx):
+    from record_preprocessor import preprocess_handler
+
+    # Monta registros de captura a partir das linhas da linha de base, como o Model Monitor faria
+    outputs = ensure_preprocessed(ctx)
+    records = []
+    with open(outputs["baseline_data"]) as f:
+        for line in f:
+            if len(records) >= ctx["capture_records"]:
+                break
+            records.append(_Obj(
+                endpoint_input=_Obj(encoding="CSV", data=line.rstrip("\n")),
+                endpoint_output=_Obj(encoding="CSV", data="0.1\n"),
+                event_metadata=_Obj(custom_attribute=None),
+            ))
+
+    def run():
+        latencies = np.empty(len(records))
+        for i, record in enumerate(records):
+            start = time.perf_counter()
+            preprocess_handler(record)
+            latencies[i] = time.perf_counter() - start
+        return {"items": len(records), "item_latencies": latencies}
+
+    return run
+
+
+def step_baseline_statistics(ctx):
+    from utils.baseline_utils import generate_baseline
+
+    outputs = ensure_preprocessed(ctx)
+    baseline_dir = os.path.join(ctx["workdir"], "baseline-results")
+
+    def run():
+        result = generate_baseline(outputs["baseline_data"], baseline_dir)
+        return {"items": result["item_count"]}
+
+    return run
+
+
+def step_storage(ctx):
+    import shutil
+    from utils.storage_utils import join, open_uri, upload_file, download_file
+
+    # Usa o CSV de entrada da escala como objeto grande; o destino pode ser um prefixo S3 real (--storage-uri)
+    source = ctx["input_path"]
+    size_mib = os.path.getsize(source) / 2 ** 20
+    object_uri = join(ctx["storage_uri"], str(ctx["rows"]), "object.csv")
+    download_path = os.path.join(ctx["workdir"], "storage-download.csv")
+
+    def streaming_write():
+        with open(source, "rb") as src, open_uri(object_uri, "wb") as dst:
+            shutil.copyfileobj(src, dst, STORAGE_BLOCK_SIZE)
+
+    def streaming_read():
+        with open_uri(object_uri) as f:
+            while f.read(STORAGE_BLOCK_SIZE):
+                pass
+
+    operations = {
+        "upload_file": lambda: upload_file(source, object_uri),
+        "download_file": lambda: download_file(object_uri, download_path),
+        "streaming_write": streaming_write,
+        "streaming_read": streaming_read,
+    }
+
+    def run():
+        metrics = {}
+        for name, operation in operations.items():
+            start = time.perf_counter()
+            operation()
+            metrics[f"{name}_mib_s"] = size_mib / (time.perf_counter() - start)
+        metrics["object_mib"] = size_mib
+        os.remove(download_path)
+        # Itens = MiB transferidos nas quatro operações, então a vazão é em MiB/s
+        return {"items": size_mib * len(operations), "metrics": metrics}
+
+    return run
+
+
+def step_model_quality(ctx):
+    from utils.model_quality_utils import read_capture_predictions, read_ground_truth, ModelQualityEngine
+
+    # Uma inferência capturada (e um rótulo verdadeiro) por linha da escala
+    capture_path, ground_truth_path = get_model_quality_data(ctx["rows"], ctx["data_dir"], seed=ctx["seed"])
+
+    def run():
+        engine = ModelQualityEngine(window="1h")
+        engine.add_predictions(read_capture_predictions(capture_path))
+        matched = engine.add_ground_truth(read_ground_truth(ground_truth_path))
+        windows = engine.window_metrics()
+        return {"items": matched, "metrics": {
+            "windows": len(windows),
+            "pending_predictions": len(engine.pending_predictions),
+            "dropped_predictions": engine.dropped_predictions,
+        }}
+
+    return run
+
+
+# Etapas disponíveis, na ordem de execução. Cada função prepara os dados necessários
+# (fora da medição) e retorna a função que é medida.
+STEPS = {
+    "preprocess": step_preprocess,
+    "split": step_split,
+    "train": step_train,
+    "evaluate": step_evaluate,
+    "record_preprocessor": step_record_preprocessor,
+    "baseline_statistics": step_baseline_statistics,
+    "model_quality": step_model_quality,
+    "storage": step_storage,
+}
+
+
+def summarize(values):
+    """
+    Calcula estatísticas de latência para uma lista de durações em segundos.
+
+    Args:
+        values (array-like): Durações em segundos.
+
+    Returns:
+        dict: Mínimo, média, máximo e percentis p50/p90/p99.
+    """
+    values = np.asarray(values, dtype=float)
+    return {
+        "min": float(values.min()),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def measure(run, repeat):
+    """
+    Mede uma etapa: uma execução sob tracemalloc para o pico de memória e `repeat` execuções cronometradas.
+
+    O tracemalloc fica desligado durante as execuções cronometradas para não distorcer as latências.
+
+    Args:
+        run (callable): Função da etapa; retorna um dicionário com `items` e, opcionalmente,
+            `item_latencies` e `metrics` (métricas adicionais da etapa).
+        repeat (int): Número de execuções cronometradas.
+
+    Returns:
+        dict: Latências, throughput e memória da etapa.
+    """
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        seconds.append(time.perf_counter() - start)
+
+    latency = summarize(seconds)
+    measurement = {
+        "items": result["items"],
+        "repeat": repeat,
+        "seconds": seconds,
+        "latency_s": latency,
+        "throughput_items_s": result["items"] / latency["p50"] if latency["p50"] > 0 else None,
+        "peak_traced_mb": peak / 2**20,
+        # ru_maxrss é o pico do processo inteiro até este ponto (em KiB no Linux)
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10,
+    }
+    if result.get("item_latencies") is not None:
+        measurement["item_latency_s"] = summarize(result["item_latencies"])
+    if result.get("metrics"):
+        measurement["metrics"] = result["metrics"]
+
+    return measurement
+
+
+def environment_info():
+    """
+    Coleta informações do ambiente e do commit atual para permitir comparar execuções.
+
+    Returns:
+        dict: Commit git, versões de bibliotecas e dados da máquina.
+    """
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versions = {}
+    for module in ["numpy", "pandas", "sklearn", "xgboost"]:
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+
+    return {
+        "git_commit": git("rev-parse", "HEAD"),
+        "git_dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def run_benchmarks(rows, steps, repeat, data_dir, work_dir, capture_records=100_000, seed=1729, storage_uri=None):
+    """
+    Executa as etapas selecionadas para cada escala de dados sintéticos.
+
+    Args:
+        rows (list[int]): Escalas (número de linhas) a medir.
+        steps (list[str]): Nomes das etapas, conforme STEPS.
+        repeat (int): Número de execuções cronometradas por etapa.
+        data_dir (str): Diretório dos datasets sintéticos (reutilizados entre execuções).
+        work_dir (str): Diretório de trabalho para as saídas das etapas.
+        capture_records (int, opcional): Máximo de registros de captura usados por `record_preprocessor`.
+        seed (int, opcional): Semente dos dados sintéticos.
+        storage_uri (str, opcional): Prefixo S3 ou file:// usado pela etapa `storage`; por padrão, o diretório de trabalho.
+
+    Returns:
+        list[dict]: Uma medição por combinação de escala e etapa.
+    """
+    results = []
+
+    for n_rows in rows:
+        workdir = os.path.join(os.path.abspath(work_dir), str(n_rows))
+        output_prefix = os.path.join(workdir, "output")
+        os.makedirs(workdir, exist_ok=True)
+
+        ctx = {
+            "rows": n_rows,
+            "input_path": get_dataset(n_rows, data_dir, seed=seed),
+            "workdir": workdir,
+            "output_prefix": output_prefix,
+            "s3_root": os.path.join(os.path.abspath(work_dir), "s3"),
+            "storage_uri": storage_uri or f"file://{os.path.join(os.path.abspath(work_dir), 's3', 'storage')}",
+            "capture_records": capture_records,
+            "data_dir": data_dir,
+            "seed": seed,
+        }
+
+        for name in steps:
+            print(f"## {name} | {n_rows} linhas")
+            measurement = measure(STEPS[name](ctx), repeat)
+            results.append({"rows": n_rows, "step": name, **measurement})
+            print(
+                f"   p50 {measurement['latency_s']['p50']:.3f}s | "
+                f"{measurement['throughput_items_s'] or 0:,.0f} itens/s | "
+                f"pico {measurement['peak_traced_mb']:.1f} MiB"
+            )
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks offline das etapas do pipeline com dados sintéticos.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Escalas em número de linhas (ex.: 10000 1000000 100000000)")
+    parser.add_argument("--steps", nargs="+", choices=list(STEPS), default=list(STEPS),
+                        help="Etapas a medir")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções cronometradas por etapa")
+    parser.add_argument("--capture-records", type=int, default=100_000,
+                        help="Máximo de registros de captura para record_preprocessor")
+    parser.add_argument("--seed", type=int, default=1729)
+    parser.add_argument("--storage-uri", default=None,
+                        help="Prefixo S3 (ex.: s3://bucket/bench) ou file:// da etapa storage (padrão: diretório de trabalho)")
+    parser.add_argument("--data-dir", default=os.path.join(REPO_ROOT, "benchmarks", "data"))
+    parser.add_argument("--work-dir", default=os.path.join(REPO_ROOT, "benchmarks", "work"))
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de resultados (padrão: benchmarks/results/<data>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    # Os substitutos precisam estar instalados antes da importação de pipeline_steps
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    install_stand_ins()
+
+    started_at = strftime("%Y-%m-%dT%H:%M:%SZ", gmtime())
+    env = environment_info()
+    results = run_benchmarks(
+        args.rows, args.steps, args.repeat, args.data_dir, args.work_dir,
+        capture_records=args.capture_records, seed=args.seed, storage_uri=args.storage_uri,
+    )
+
+    output = args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results",
+        f"{strftime('%Y%m%d-%H%M%S', gmtime())}-{(env['git_commit'] or 'nogit')[:8]}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "started_at": started_at,
+            "environment": env,
+            "config": {"rows": args.rows, "steps": args.steps, "repeat": args.repeat,
+                       "capture_records": args.capture_records, "seed": args.seed,
+                       "storage_uri": args.storage_uri},
+            "results": results,
+        }, f, indent=2)
+
+    print(f"## Resultados salvos em {output}")
+    return output
+
+
+if __name__ == "__main__":
+    main()
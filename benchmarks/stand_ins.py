@@ -0,0 +1,126 @@
+import sys
+import types
+import uuid
+
+# Substituto local para o MLflow. É instalado em sys.modules antes de importar os módulos de
+# pipeline_steps, de modo que os benchmarks medem somente o custo das etapas, sem servidor de
+# rastreamento. O S3 não precisa de substituto: as etapas usam URIs file:// (utils/storage_utils.py).
+
+
+class _RunInfo:
+    def __init__(self, run_id):
+        self.run_id = run_id
+
+
+class _Run:
+    def __init__(self, run_id=None, run_name=None):
+        self.info = _RunInfo(run_id or uuid.uuid4().hex)
+        self.run_name = run_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        end_run()
+
+
+class _Experiment:
+    def __init__(self, name):
+        self.name = name
+        self.experiment_id = uuid.uuid4().hex
+
+
+class _Dataset:
+    def __init__(self, df, source=None, **kwargs):
+        self.source = source
+        self.shape = df.shape
+
+
+# Registro do que as etapas enviariam ao MLflow; útil para inspecionar uma execução
+tracked = {"params": {}, "metrics": {}, "artifacts": [], "inputs": []}
+_active_runs = []
+
+
+def set_tracking_uri(uri):
+    tracked["tracking_uri"] = uri
+
+
+def set_experiment(experiment_name=None, **kwargs):
+    return _Experiment(experiment_name)
+
+
+def start_run(run_id=None, run_name=None, nested=False, **kwargs):
+    run = _Run(run_id=run_id, run_name=run_name)
+    _active_runs.append(run)
+    return run
+
+
+def end_run(*args, **kwargs):
+    _active_runs.clear()
+
+
+def log_param(key, value):
+    tracked["params"][key] = value
+
+
+def log_params(params):
+    tracked["params"].update(params)
+
+
+def log_metric(key, value, **kwargs):
+    tracked["metrics"][key] = value
+
+
+def log_metrics(metrics, **kwargs):
+    tracked["metrics"].update(metrics)
+
+
+def log_artifact(local_path, *args, **kwargs):
+    tracked["artifacts"].append(local_path)
+
+
+def log_input(dataset, context=None, **kwargs):
+    tracked["inputs"].append((context, dataset))
+
+
+def from_pandas(df, source=None, **kwargs):
+    return _Dataset(df, source=source, **kwargs)
+
+
+def install_stand_ins():
+    """
+    Registra os módulos substitutos de `mlflow` em sys.modules.
+
+    Deve ser chamada antes de importar qualquer módulo de pipeline_steps.
+
+    Returns:
+        dict: Registro dos parâmetros, métricas, artefatos e datasets enviados ao MLflow.
+    """
+    this = sys.modules[__name__]
+
+    mlflow = types.ModuleType("mlflow")
+    for name in [
+        "set_tracking_uri", "set_experiment", "start_run", "end_run", "log_param",
+        "log_params", "log_metric", "log_metrics", "log_artifact", "log_input",
+    ]:
+        setattr(mlflow, name, getattr(this, name))
+
+    mlflow_data = types.ModuleType("mlflow.data")
+    mlflow_data.from_pandas = from_pandas
+    pandas_dataset = types.ModuleType("mlflow.data.pandas_dataset")
+    pandas_dataset.PandasDataset = _Dataset
+    mlflow_data.pandas_dataset = pandas_dataset
+    mlflow.data = mlflow_data
+
+    mlflow_xgboost = types.ModuleType("mlflow.xgboost")
+    mlflow_xgboost.log_model = lambda *args, **kwargs: None
+    mlflow.xgboost = mlflow_xgboost
+
+    sys.modules.update({
+        "mlflow": mlflow,
+        "mlflow.data": mlflow_data,
+        "mlflow.data.pandas_dataset": pandas_dataset,
+        "mlflow.xgboost": mlflow_xgboost,
+    })
+
+    return tracked
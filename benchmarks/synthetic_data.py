@@ -0,0 +1,240 @@
+import os
+import csv
+import numpy as np
+import pandas as pd
+
+# Colunas do arquivo bank-additional-full.csv, na ordem original
+COLUMNS = [
+    "age", "job", "marital", "education", "default", "housing", "loan", "contact",
+    "month", "day_of_week", "duration", "campaign", "pdays", "previous", "poutcome",
+    "emp.var.rate", "cons.price.idx", "cons.conf.idx", "euribor3m", "nr.employed", "y",
+]
+
+# Níveis e frequências aproximadas das variáveis categóricas do dataset original
+CATEGORICAL_LEVELS = {
+    "job": (
+        ["admin.", "blue-collar", "entrepreneur", "housemaid", "management", "retired",
+         "self-employed", "services", "student", "technician", "unemployed", "unknown"],
+        [0.253, 0.225, 0.035, 0.026, 0.071, 0.042, 0.035, 0.096, 0.021, 0.164, 0.024, 0.008],
+    ),
+    "marital": (
+        ["divorced", "married", "single", "unknown"],
+        [0.112, 0.605, 0.281, 0.002],
+    ),
+    "education": (
+        ["basic.4y", "basic.6y", "basic.9y", "high.school", "illiterate",
+         "professional.course", "university.degree", "unknown"],
+        [0.101, 0.056, 0.147, 0.231, 0.001, 0.127, 0.295, 0.042],
+    ),
+    "default": (["no", "unknown", "yes"], [0.791, 0.208, 0.001]),
+    "housing": (["no", "unknown", "yes"], [0.452, 0.024, 0.524]),
+    "loan": (["no", "unknown", "yes"], [0.824, 0.024, 0.152]),
+    "contact": (["cellular", "telephone"], [0.635, 0.365]),
+    "month": (
+        ["apr", "aug", "dec", "jul", "jun", "mar", "may", "nov", "oct", "sep"],
+        [0.064, 0.150, 0.004, 0.174, 0.129, 0.013, 0.334, 0.100, 0.018, 0.014],
+    ),
+    "day_of_week": (["fri", "mon", "thu", "tue", "wed"], [0.190, 0.207, 0.209, 0.196, 0.198]),
+    "poutcome": (["failure", "nonexistent", "success"], [0.103, 0.863, 0.034]),
+}
+
+# Valores discretos dos indicadores macroeconômicos (estes são constantes por período no dataset original)
+EMP_VAR_RATE = [1.4, -1.8, 1.1, -0.1, -2.9, -3.4, -1.7, -1.1, -3.0, -0.2]
+NR_EMPLOYED = [5228.1, 5099.1, 5191.0, 5195.8, 5076.2, 5017.5, 4991.6, 5008.7, 4963.6, 5176.3]
+
+
+def generate_chunk(n_rows, rng):
+    """
+    Gera um bloco de linhas sintéticas com o mesmo esquema do bank-additional-full.csv.
+
+    Args:
+        n_rows (int): Número de linhas a gerar.
+        rng (numpy.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        pandas.DataFrame: Bloco de dados sintéticos.
+    """
+    data = {}
+    data["age"] = np.clip(rng.normal(40, 10.4, n_rows), 17, 98).astype(int)
+
+    for col, (levels, probs) in CATEGORICAL_LEVELS.items():
+        probs = np.asarray(probs) / np.sum(probs)
+        data[col] = np.asarray(levels, dtype=object)[rng.choice(len(levels), size=n_rows, p=probs)]
+
+    data["duration"] = rng.exponential(258, n_rows).astype(int)
+    data["campaign"] = np.clip(rng.geometric(0.39, n_rows), 1, 56)
+
+    # ~96% dos clientes nunca foram contatados (pdays == 999)
+    contacted = rng.random(n_rows) < 0.037
+    data["pdays"] = np.where(contacted, rng.integers(0, 28, n_rows), 999)
+    data["previous"] = np.where(
+        data["poutcome"] == "nonexistent", 0, np.clip(rng.geometric(0.6, n_rows), 1, 7)
+    )
+
+    period = rng.integers(0, len(EMP_VAR_RATE), n_rows)
+    data["emp.var.rate"] = np.asarray(EMP_VAR_RATE)[period]
+    data["cons.price.idx"] = np.round(rng.uniform(92.201, 94.767, n_rows), 3)
+    data["cons.conf.idx"] = np.round(rng.uniform(-50.8, -26.9, n_rows), 1)
+    data["euribor3m"] = np.round(rng.uniform(0.634, 5.045, n_rows), 3)
+    data["nr.employed"] = np.asarray(NR_EMPLOYED)[period]
+
+    # Alvo correlacionado com algumas features para que o modelo tenha sinal a aprender (~11% de "yes")
+    logit = (
+        -2.6
+        + 2.2 * (data["poutcome"] == "success")
+        + 0.9 * np.isin(data["job"], ["student", "retired"])
+        - 0.12 * (data["campaign"] - 1)
+        + 0.6 * (data["contact"] == "cellular")
+        + 0.002 * (data["duration"] - 258)
+    )
+    data["y"] = np.where(rng.random(n_rows) < 1 / (1 + np.exp(-logit)), "yes", "no")
+
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def generate_bank_marketing(n_rows, output_path, chunk_size=1_000_000, seed=1729):
+    """
+    Gera um arquivo CSV sintético no formato do bank-additional-full.csv (separador ';').
+
+    O arquivo é escrito em blocos, portanto escalas maiores que a memória disponível
+    (por exemplo 100M linhas) podem ser geradas.
+
+    Args:
+        n_rows (int): Número total de linhas.
+        output_path (str): Caminho local do arquivo CSV de saída.
+        chunk_size (int, opcional): Número de linhas por bloco gerado.
+        seed (int, opcional): Semente do gerador aleatório.
+
+    Returns:
+        str: Caminho do arquivo gerado.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    rng = np.random.default_rng(seed)
+    tmp_path = f"{output_path}.tmp"
+
+    written = 0
+    with open(tmp_path, "w", newline="") as f:
+        while written < n_rows:
+            n = min(chunk_size, n_rows - written)
+            generate_chunk(n, rng).to_csv(
+                f, sep=";", index=False, header=written == 0, quoting=csv.QUOTE_NONNUMERIC
+            )
+            written += n
+
+    # Renomeia somente no final para que arquivos parciais nunca sejam reutilizados
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+def get_dataset(n_rows, data_dir, seed=1729):
+    """
+    Retorna o caminho de um dataset sintético, gerando-o somente se ainda não existir.
+
+    Args:
+        n_rows (int): Número total de linhas.
+        data_dir (str): Diretório onde os datasets gerados são armazenados.
+        seed (int, opcional): Semente do gerador aleatório.
+
+    Returns:
+        str: Caminho do arquivo CSV.
+    """
+    path = os.path.join(data_dir, f"bank-additional-synthetic-{n_rows}-{seed}.csv")
+
+    if not os.path.exists(path):
+        print(f"## Gerando {n_rows} linhas sintéticas em {path}")
+        generate_bank_marketing(n_rows, path, seed=seed)
+
+    return path
+
+
+def generate_model_quality_chunk(start, n_records, hours, rng):
+    """
+    Gera um bloco de linhas JSON de captura e de rótulos verdadeiros para as inferências start .. start + n_records - 1.
+
+    Args:
+        start (int): Número da primeira inferência do bloco (define os eventId).
+        n_records (int): Número de inferências do bloco.
+        hours (int): Intervalo de tempo, em horas, pelo qual as inferências são distribuídas.
+        rng (numpy.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        tuple: (linhas de captura, linhas de rótulos verdadeiros), como pandas.Series.
+    """
+    # ~11% de positivos, com probabilidades previstas maiores para os positivos
+    label = (rng.random(n_records) < 0.11).astype(int)
+    probability = pd.Series(np.clip(rng.normal(0.3 + 0.3 * label, 0.15), 0, 1)).map("{:.8f}".format)
+    event_id = pd.Series(np.arange(start, start + n_records)).map("{:032x}".format)
+    inference_time = (
+        pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, hours * 3600, n_records), unit="s")
+    ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    capture = (
+        '{"captureData": {"endpointInput": {"observedContentType": "text/csv", "mode": "INPUT", "data": "", "encoding": "CSV"}, '
+        '"endpointOutput": {"observedContentType": "text/csv; charset=utf-8", "mode": "OUTPUT", "data": "'
+        + probability + '\\n", "encoding": "CSV"}}, "eventMetadata": {"eventId": "' + event_id
+        + '", "inferenceTime": "' + inference_time + '"}, "eventVersion": "0"}'
+    )
+    ground_truth = (
+        '{"groundTruthData": {"data": "' + pd.Series(label).astype(str) + '", "encoding": "CSV"}, '
+        '"eventMetadata": {"eventId": "' + event_id + '"}, "eventVersion": "0"}'
+    )
+    return capture, ground_truth
+
+
+def generate_model_quality_data(n_records, capture_path, ground_truth_path, hours=3, chunk_size=1_000_000, seed=1729):
+    """
+    Gera arquivos sintéticos de captura de dados do endpoint e de rótulos verdadeiros (JSON Lines), no formato
+    lido por `utils/model_quality_utils.py`. Os rótulos são gravados fora de ordem, como se chegassem depois:
+    os blocos são gravados em ordem aleatória e as linhas de cada bloco, embaralhadas.
+
+    Os arquivos são escritos em blocos, como em `generate_bank_marketing`. Cada bloco usa um gerador próprio
+    (semente e número do bloco), então pode ser gerado de novo, na ordem dos rótulos, sem ficar em memória.
+
+    Args:
+        n_records (int): Número de inferências.
+        capture_path (str): Caminho local do arquivo de captura.
+        ground_truth_path (str): Caminho local do arquivo de rótulos verdadeiros.
+        hours (int, opcional): Intervalo de tempo, em horas, pelo qual as inferências são distribuídas.
+        chunk_size (int, opcional): Número de inferências por bloco gerado.
+        seed (int, opcional): Semente do gerador aleatório.
+
+    Returns:
+        tuple: Caminhos dos arquivos de captura e de rótulos verdadeiros.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(capture_path)), exist_ok=True)
+    starts = list(range(0, n_records, chunk_size))
+
+    def chunk(i):
+        rng = np.random.default_rng([seed, i])
+        return generate_model_quality_chunk(starts[i], min(chunk_size, n_records - starts[i]), hours, rng)
+
+    block_order = np.random.default_rng(seed).permutation(len(starts))
+
+    with open(f"{capture_path}.tmp", "w") as capture_file, open(f"{ground_truth_path}.tmp", "w") as ground_truth_file:
+        for i in range(len(starts)):
+            capture_file.write("\n".join(chunk(i)[0]) + "\n")
+        for i in block_order:
+            ground_truth = chunk(i)[1]
+            shuffled = ground_truth.iloc[np.random.default_rng([seed, i, 1]).permutation(len(ground_truth))]
+            ground_truth_file.write("\n".join(shuffled) + "\n")
+
+    # Renomeia somente no final para que arquivos parciais nunca sejam reutilizados
+    os.replace(f"{capture_path}.tmp", capture_path)
+    os.replace(f"{ground_truth_path}.tmp", ground_truth_path)
+
+    return capture_path, ground_truth_path
+
+
+def get_model_quality_data(n_records, data_dir, seed=1729):
+    """
+    Retorna os caminhos dos arquivos de captura e de rótulos verdadeiros, gerando-os somente se ainda não existirem.
+    """
+    capture_path = os.path.join(data_dir, f"capture-synthetic-{n_records}-{seed}.jsonl")
+    ground_truth_path = os.path.join(data_dir, f"ground-truth-synthetic-{n_records}-{seed}.jsonl")
+
+    if not (os.path.exists(capture_path) and os.path.exists(ground_truth_path)):
+        print(f"## Gerando {n_records} inferências e rótulos sintéticos em {data_dir}")
+        generate_model_quality_data(n_records, capture_path, ground_truth_path, seed=seed)
+
+    return capture_path, ground_truth_path
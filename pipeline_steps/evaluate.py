@@ -7,14 +7,14 @@ from sklearn.metrics import roc_curve, auc
 import matplotlib.pyplot as plt
 import tarfile
 import pickle as pkl
-import boto3
+from utils.storage_utils import read_csv, write_csv, download_file
 
 def load_model(model_data_s3_uri):
     """
     Carrega um modelo XGBoost a partir de um arquivo .tar.gz armazenado no S3.
 
     Args:
-        model_data_s3_uri (str): URI S3 do arquivo do modelo.
+        model_data_s3_uri (str): URI S3 (ou local) do arquivo do modelo.
 
     Returns:
         xgboost.Booster: Modelo XGBoost carregado.
@@ -22,11 +22,8 @@ def load_model(model_data_s3_uri):
     # Define o nome do arquivo local para o modelo
     model_file = "./xgboost-model.tar.gz"
     
-    # Extrai o nome do bucket e a chave do URI S3
-    bucket, key = model_data_s3_uri.replace("s3://", "").split("/", 1)
-    
-    # Baixa o arquivo do modelo do S3
-    boto3.client("s3").download_file(bucket, key, model_file)
+    # Baixa o arquivo do modelo do S3 (por intervalos em paralelo, com o cliente compartilhado)
+    download_file(model_data_s3_uri, model_file)
     
     # Extrai o conteúdo do arquivo tar.gz
     with tarfile.open(model_file, "r:gz") as t:
@@ -112,8 +109,8 @@ def evaluate(
         run = mlflow.start_run(run_id=run_id) if run_id else mlflow.start_run(run_name=f"evaluate-{suffix}", nested=True)
         
         # Carrega os dados de teste
-        X_test = xgb.DMatrix(pd.read_csv(test_x_data_s3_path, header=None).values)
-        y_test = pd.read_csv(test_y_data_s3_path, header=None).to_numpy()
+        X_test = xgb.DMatrix(read_csv(test_x_data_s3_path, header=None).values)
+        y_test = read_csv(test_y_data_s3_path, header=None).to_numpy()
     
         # Carrega o modelo e faz previsões
         probability = load_model(model_s3_path).predict(X_test)
@@ -141,11 +138,11 @@ def evaluate(
         prediction_baseline_s3_path = f"{output_s3_prefix}/prediction_baseline/prediction_baseline.csv"
     
         # Salva a linha de base de previsão no S3
-        pd.DataFrame({
+        write_csv(pd.DataFrame({
             "prediction": np.array(np.round(probability), dtype=int),
             "probability": probability,
             "label": y_test.squeeze()
-        }).to_csv(prediction_baseline_s3_path, index=False, header=True)
+        }), prediction_baseline_s3_path, index=False, header=True)
         
         # Retorna os resultados e informações relacionadas
         return {
@@ -1,4 +1,3 @@
-import boto3
 import pandas as pd
 import numpy as np
 import mlflow
@@ -7,13 +6,15 @@ from time import gmtime, strftime
 from sagemaker.session import Session
 from sagemaker.feature_store.feature_store import FeatureStore
 from sagemaker.feature_store.feature_group import FeatureGroup
+from utils.storage_utils import get_session, write_csv
 
 def extract_features(
     feature_group_name,
     query_output_s3_path,
 ):
-    region = boto3.Session().region_name
-    boto_session = boto3.Session(region_name=region)
+    # Sessão boto3 compartilhada pelo processo (criada uma única vez)
+    boto_session = get_session()
+    region = boto_session.region_name
 
     sagemaker_client = boto_session.client(service_name="sagemaker", region_name=region)
     featurestore_runtime = boto_session.client(service_name="sagemaker-featurestore-runtime",region_name=region)
@@ -93,16 +94,14 @@ def prepare_datasets(
         test_y_data_output_s3_path = f"{output_s3_prefix}/test/test_y.csv"
         baseline_data_output_s3_path = f"{output_s3_prefix}/baseline/baseline.csv"
         
-        # Upload dos datasets para o S3
-        train_data.to_csv(train_data_output_s3_path, index=False, header=False)
-        validation_data.to_csv(validation_data_output_s3_path, index=False, header=False)
-        test_data[target_col].to_csv(test_y_data_output_s3_path, index=False, header=False)
-        test_data.drop([target_col], axis=1).to_csv(test_x_data_output_s3_path, index=False, header=False)
+        # Upload dos datasets para o S3 (multipart upload em paralelo, sem arquivos locais intermediários)
+        write_csv(train_data, train_data_output_s3_path, index=False, header=False)
+        write_csv(validation_data, validation_data_output_s3_path, index=False, header=False)
+        write_csv(test_data[target_col], test_y_data_output_s3_path, index=False, header=False)
+        write_csv(test_data.drop([target_col], axis=1), test_x_data_output_s3_path, index=False, header=False)
         
         # Salvar o dataset de linha de base para monitoramento de modelo
-        df_model_data.drop([target_col], axis=1).to_csv(baseline_data_output_s3_path, index=False, header=False)
-        
-        s3 = boto3.client("s3")
+        write_csv(df_model_data.drop([target_col], axis=1), baseline_data_output_s3_path, index=False, header=False)
       
         print(f"Datasets foram enviados para o S3: {output_s3_prefix}. Saindo.")
         
@@ -133,5 +132,6 @@ def prepare_datasets(
 # Ela também registra as métricas e parâmetros no MLflow. O resultado da preparação dos datasets, incluindo os caminhos dos datasets no S3,
 # o nome do experimento e o ID da execução do pipeline, é retornado como um dicionário.
 
+# Os datasets são gravados com `utils/storage_utils.py`, que usa um cliente S3 compartilhado e multipart upload em paralelo.
 # O código usa as bibliotecas `boto3`, `pandas`, `numpy`, `mlflow`, `sagemaker.session`, `sagemaker.feature_store.feature_store` 
 # e `sagemaker.feature_store.feature_group` para interagir com o Amazon SageMaker Feature Store, o Amazon S3 e o MLflow.
\ No newline at end of file
@@ -0,0 +1,16 @@
+# Hiperparâmetros do algoritmo, compartilhados pelo estimador do SageMaker (get_xgb_estimator)
+# e pelo treinamento local de train.py. Este módulo não tem dependências, então pode ser importado
+# no notebook antes da instalação do xgboost.
+XGB_HYPERPARAMETERS = {
+    "num_round": 100,               # Número de rodadas de boosting para treinamento
+    "max_depth": 3,                 # Profundidade máxima de uma árvore
+    "eta": 0.5,                     # Taxa de aprendizado, controla o tamanho do passo na descida do gradiente
+    "alpha": 2.5,                   # Termo de regularização L1 nos pesos
+    "objective": "binary:logistic", # Função objetivo para classificação binária
+    "eval_metric": "auc",           # Métrica de avaliação para dados de validação
+    "subsample": 0.8,               # Fração de amostras usadas para treinar cada árvore
+    "colsample_bytree": 0.8,        # Fração de features usadas para treinar cada árvore
+    "min_child_weight": 3,          # Soma mínima do peso da instância necessária em um nó filho
+    "early_stopping_rounds": 10,    # Número de rodadas sem melhoria antes de parar precocemente
+    "verbosity": 1,                 # Nível de detalhamento para registro de log
+}
@@ -4,6 +4,89 @@ import mlflow  # Importa mlflow para rastreamento de experimentos
 from mlflow.data.pandas_dataset import PandasDataset  # Importa PandasDataset do MLflow
 from time import gmtime, strftime  # Importa funções de tempo
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder  # Importa ferramentas de pré-processamento
+from utils.storage_utils import read_csv, write_csv  # Importa a leitura e escrita de CSV no S3 ou local
+
+# Níveis conhecidos das variáveis categóricas do bank-additional-full.csv. As colunas são lidas
+# diretamente como `category` com estes níveis, o que fixa as colunas dummy geradas.
+CATEGORICAL_LEVELS = {
+    "job": ["admin.", "blue-collar", "entrepreneur", "housemaid", "management", "retired",
+            "self-employed", "services", "student", "technician", "unemployed", "unknown"],
+    "marital": ["divorced", "married", "single", "unknown"],
+    "education": ["basic.4y", "basic.6y", "basic.9y", "high.school", "illiterate",
+                  "professional.course", "university.degree", "unknown"],
+    "default": ["no", "unknown", "yes"],
+    "housing": ["no", "unknown", "yes"],
+    "loan": ["no", "unknown", "yes"],
+    "contact": ["cellular", "telephone"],
+    "month": ["apr", "aug", "dec", "jul", "jun", "mar", "may", "nov", "oct", "sep"],
+    "day_of_week": ["fri", "mon", "thu", "tue", "wed"],
+    "poutcome": ["failure", "nonexistent", "success"],
+    "y": ["no", "yes"],
+}
+
+# Tipos compactos para as colunas numéricas do arquivo de entrada
+NUMERIC_DTYPES = {
+    "age": np.uint8,
+    "duration": np.int32,
+    "campaign": np.int16,
+    "pdays": np.int16,
+    "previous": np.int16,
+    "emp.var.rate": np.float32,
+    "cons.price.idx": np.float32,
+    "cons.conf.idx": np.float32,
+    "euribor3m": np.float32,
+    "nr.employed": np.float32,
+}
+
+def read_input_data(input_data_s3_path):
+    """
+    Lê o CSV de entrada com tipos compactos: categorias com níveis conhecidos e numéricos de menor largura.
+
+    As colunas categóricas são lidas como `category` e validadas contra CATEGORICAL_LEVELS; um nível
+    desconhecido geraria colunas dummy diferentes das esperadas pelo modelo, então é tratado como erro.
+
+    Args:
+        input_data_s3_path (str): Caminho S3 (ou local) para o arquivo CSV de entrada.
+
+    Returns:
+        pandas.DataFrame: Dados de entrada.
+
+    Raises:
+        ValueError: Se uma coluna categórica contiver um nível desconhecido.
+    """
+    df_data = read_csv(
+        input_data_s3_path,
+        sep=";",
+        dtype={**NUMERIC_DTYPES, **{col: "category" for col in CATEGORICAL_LEVELS}},
+    )
+
+    for col, levels in CATEGORICAL_LEVELS.items():
+        unknown_levels = set(df_data[col].cat.categories) - set(levels)
+        if unknown_levels:
+            raise ValueError(f"Níveis desconhecidos na coluna {col}: {sorted(unknown_levels)}")
+        df_data[col] = df_data[col].cat.set_categories(sorted(levels))
+
+    return df_data
+
+def to_sparse_matrix(df_model_data):
+    """
+    Converte a matriz do modelo em uma matriz esparsa CSR float32, que pode ser passada diretamente ao XGBoost
+    (`xgb.DMatrix(X, label=y)`). As colunas dummy são majoritariamente zero, então o formato esparso ocupa
+    menos da metade da matriz densa em float32 que o XGBoost montaria a partir do DataFrame.
+
+    Args:
+        df_model_data (pandas.DataFrame): Features numéricas (por exemplo, a matriz do modelo sem a coluna alvo).
+
+    Returns:
+        scipy.sparse.csr_matrix: Matriz esparsa com as mesmas colunas, na mesma ordem.
+    """
+    return df_model_data.astype(pd.SparseDtype(np.float32, 0)).sparse.to_coo().tocsr()
+
+def memory_usage_mb(df):
+    """
+    Retorna a memória ocupada por um DataFrame, em MiB, incluindo o conteúdo de colunas object.
+    """
+    return df.memory_usage(deep=True).sum() / 2**20
 
 def preprocess(
     input_data_s3_path,  # Caminho S3 para os dados de entrada
@@ -13,8 +96,7 @@ def preprocess(
     pipeline_run_name=None,  # Nome da execução do pipeline (opcional)
     run_id=None,  # ID da execução (opcional)
 ):
-    
-  """
+    """
     Pré-processa dados de entrada, divide em conjuntos de treino/validação/teste e salva no S3.
 
     Esta função realiza as seguintes operações:
@@ -57,7 +139,7 @@ def preprocess(
         run = mlflow.start_run(run_id=run_id) if run_id else mlflow.start_run(run_name=f"processing-{suffix}", nested=True)  # Inicia uma execução MLflow
 
         # Carrega os dados
-        df_data = pd.read_csv(input_data_s3_path, sep=";")  # Lê o CSV de entrada
+        df_data = read_input_data(input_data_s3_path)  # Lê o CSV de entrada com tipos compactos
 
         input_dataset = mlflow.data.from_pandas(df_data, source=input_data_s3_path)  # Cria um dataset MLflow
         mlflow.log_input(input_dataset, context="raw_input")  # Registra o dataset de entrada
@@ -65,12 +147,10 @@ def preprocess(
         target_col = "y"  # Define a coluna alvo
     
         # Cria uma variável indicadora para contatos prévios
-        df_data["no_previous_contact"] = np.where(df_data["pdays"] == 999, 1, 0)
-    
+        df_data["no_previous_contact"] = (df_data["pdays"] == 999).astype(np.uint8)
+
         # Cria um indicador para indivíduos não empregados ativamente
-        df_data["not_working"] = np.where(
-            np.in1d(df_data["job"], ["student", "retired", "unemployed"]), 1, 0
-        )
+        df_data["not_working"] = df_data["job"].isin(["student", "retired", "unemployed"]).astype(np.uint8)
     
         # Remove colunas não utilizadas para modelagem
         df_model_data = df_data.drop(
@@ -84,16 +164,18 @@ def preprocess(
     
         # Categoriza idade e cria variáveis dummy
         df_model_data['age_range'] = pd.cut(df_model_data.age, bins, labels=labels, include_lowest=True)
-        df_model_data = pd.concat([df_model_data, pd.get_dummies(df_model_data['age_range'], prefix='age', dtype=int)], axis=1)
+        df_model_data = pd.concat([df_model_data, pd.get_dummies(df_model_data['age_range'], prefix='age', dtype=np.uint8)], axis=1)
         df_model_data.drop('age', axis=1, inplace=True)
         df_model_data.drop('age_range', axis=1, inplace=True)
 
-        # Escala features numéricas
+        # Escala features numéricas em float32
         scaled_features = ['pdays', 'previous', 'campaign']
-        df_model_data[scaled_features] = MinMaxScaler().fit_transform(df_model_data[scaled_features])
+        df_model_data[scaled_features] = MinMaxScaler().fit_transform(df_model_data[scaled_features].astype(np.float32))
+
+        # Converte variáveis categóricas em dummies uint8
+        df_model_data = pd.get_dummies(df_model_data, dtype=np.uint8)
 
-        # Converte variáveis categóricas em dummies
-        df_model_data = pd.get_dummies(df_model_data, dtype=int)  
+        print(f"## Memória > dados brutos: {memory_usage_mb(df_data):.1f} MiB | matriz do modelo: {memory_usage_mb(df_model_data):.1f} MiB")
     
         # Reorganiza o DataFrame com a coluna alvo no início
         df_model_data = pd.concat(
@@ -125,6 +207,12 @@ def preprocess(
                 "test": test_data.shape
             }
         )
+        mlflow.log_metrics(
+            {
+                "raw_data_memory_mb": memory_usage_mb(df_data),
+                "model_data_memory_mb": memory_usage_mb(df_model_data),
+            }
+        )
 
         # Define caminhos de saída no S3
         train_data_output_s3_path = f"{output_s3_prefix}/train/train.csv"
@@ -133,14 +221,14 @@ def preprocess(
         test_y_data_output_s3_path = f"{output_s3_prefix}/test/test_y.csv"
         baseline_data_output_s3_path = f"{output_s3_prefix}/baseline/baseline.csv"
         
-        # Salva os datasets processados no S3
-        train_data.to_csv(train_data_output_s3_path, index=False, header=False)
-        validation_data.to_csv(validation_data_output_s3_path, index=False, header=False)
-        test_data[target_col].to_csv(test_y_data_output_s3_path, index=False, header=False)
-        test_data.drop([target_col], axis=1).to_csv(test_x_data_output_s3_path, index=False, header=False)
+        # Salva os datasets processados no S3 (multipart upload em paralelo)
+        write_csv(train_data, train_data_output_s3_path, index=False, header=False)
+        write_csv(validation_data, validation_data_output_s3_path, index=False, header=False)
+        write_csv(test_data[target_col], test_y_data_output_s3_path, index=False, header=False)
+        write_csv(test_data.drop([target_col], axis=1), test_x_data_output_s3_path, index=False, header=False)
         
         # Salva o dataset de linha de base para monitoramento do modelo
-        df_model_data.drop([target_col], axis=1).to_csv(baseline_data_output_s3_path, index=False, header=False)
+        write_csv(df_model_data.drop([target_col], axis=1), baseline_data_output_s3_path, index=False, header=False)
            
         print("## Processamento de dados concluído. Saindo.")
         
@@ -168,19 +256,20 @@ def preprocess(
 # Aqui está o que a função `preprocess` faz:
 
 # 1. Configura o MLflow, definindo o URI de rastreamento e o experimento.
-# 2. Carrega os dados de um caminho S3 fornecido e registra o dataset bruto no MLflow.
+# 2. Carrega os dados de um caminho S3 fornecido, com as variáveis categóricas lidas como `category` com níveis
+#    conhecidos e as numéricas em tipos compactos, e registra o dataset bruto no MLflow.
 # 3. Realiza pré-processamento nos dados, incluindo:
 #    - Criação de variáveis indicadoras para "sem contato prévio" e "não trabalhando".
 #    - Remoção de colunas desnecessárias.
 #    - Codificação da faixa etária em variáveis binárias.
-#    - Escalamento de recursos numéricos usando `MinMaxScaler`.
-#    - Codificação de variáveis categóricas em variáveis indicadoras.
+#    - Escalamento de recursos numéricos usando `MinMaxScaler` (float32).
+#    - Codificação de variáveis categóricas em variáveis indicadoras (uint8).
 #    - Renomeação da coluna alvo para "y".
 # 4. Registra o dataset pré-processado no MLflow.
 # 5. Divide aleatoriamente os dados em conjuntos de treinamento, validação e teste.
 # 6. Registra as formas dos datasets no MLflow.
 # 7. Define os caminhos de saída no Amazon S3 para os datasets de treinamento, validação, teste e linha de base.
-# 8. Envia os datasets para o Amazon S3.
+# 8. Envia os datasets para o Amazon S3 com `utils/storage_utils.py` (cliente compartilhado e multipart upload em paralelo).
 # 9. Retorna um dicionário contendo os caminhos dos datasets no S3, o nome do experimento e o ID da execução do pipeline.
 
 # O código usa as bibliotecas `pandas`, `numpy`, `mlflow`, `mlflow.data.pandas_dataset` e `sklearn.preprocessing` para carregar,
@@ -0,0 +1,198 @@
+import os
+import tarfile
+import tempfile
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import mlflow
+from time import gmtime, strftime
+from utils.storage_utils import list_shards, open_uri, upload_file
+from pipeline_steps.hyperparameters import XGB_HYPERPARAMETERS
+
+class CSVShardIterator(xgb.DataIter):
+    """
+    Iterador de dados do XGBoost que lê shards CSV (alvo na primeira coluna, sem cabeçalho) bloco a bloco,
+    no mesmo formato que o container XGBoost do SageMaker consome. Somente um bloco fica em memória por vez;
+    o XGBoost mantém os dados já processados no cache em disco indicado por `cache_prefix`.
+
+    Args:
+        shards (list): Caminhos S3 ou locais dos arquivos CSV.
+        chunk_size (int): Número de linhas por bloco.
+        cache_prefix (str): Prefixo dos arquivos de cache da memória externa.
+    """
+
+    def __init__(self, shards, chunk_size, cache_prefix):
+        self._shards = shards
+        self._chunk_size = chunk_size
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _read_chunks(self):
+        for shard in self._shards:
+            # Lê o shard em streaming (intervalos baixados em paralelo no S3), sem cópia local
+            with open_uri(shard) as f:
+                yield from pd.read_csv(f, header=None, dtype=np.float32, chunksize=self._chunk_size)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = self._read_chunks()
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        values = chunk.to_numpy()
+        input_data(data=values[:, 1:], label=values[:, 0])
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+def build_external_memory_dmatrix(data_path, cache_dir, name, chunk_size, ref=None, nthread=None):
+    """
+    Constrói uma DMatrix de memória externa a partir dos shards CSV de uma etapa.
+
+    Args:
+        data_path (str | list): Caminho dos dados (ver `utils.storage_utils.list_shards`).
+        cache_dir (str): Diretório local para o cache em disco.
+        name (str): Nome usado no prefixo do cache.
+        chunk_size (int): Número de linhas por bloco lido.
+        ref (xgboost.DMatrix, opcional): Matriz de treinamento cujos quantis são reutilizados (validação).
+        nthread (int, opcional): Número de threads usadas na construção.
+
+    Returns:
+        xgboost.DMatrix: Matriz de memória externa pronta para `tree_method="hist"`.
+    """
+    it = CSVShardIterator(list_shards(data_path), chunk_size, os.path.join(cache_dir, name))
+
+    # ExtMemQuantileDMatrix (XGBoost >= 3.0) guarda os dados já quantizados para o hist; versões
+    # anteriores constroem uma DMatrix de memória externa a partir do mesmo iterador
+    if hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(it, ref=ref, nthread=nthread)
+    return xgb.DMatrix(it, nthread=nthread)
+
+def save_model_artifact(booster, model_output_path):
+    """
+    Salva o modelo como `xgboost-model` dentro de um model.tar.gz, o mesmo layout do artefato produzido
+    pelo job de treinamento do SageMaker e esperado por `evaluate.load_model`.
+
+    Args:
+        booster (xgboost.Booster): Modelo treinado.
+        model_output_path (str): URI S3, URI file:// ou caminho local do arquivo model.tar.gz.
+
+    Returns:
+        str: Caminho onde o artefato foi salvo.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_file = os.path.join(tmp_dir, "xgboost-model")
+        booster.save_model(model_file)
+
+        model_tar = os.path.join(tmp_dir, "model.tar.gz")
+        with tarfile.open(model_tar, "w:gz") as t:
+            t.add(model_file, arcname="xgboost-model")
+
+        # Envia o artefato para o S3 (multipart upload em paralelo) ou copia para o caminho local
+        upload_file(model_tar, model_output_path)
+
+    return model_output_path
+
+def train(
+    train_data_s3_path,
+    validation_data_s3_path,
+    output_s3_prefix,
+    tracking_server_arn,
+    hyperparameters=None,
+    chunk_size=500_000,
+    nthread=None,
+    cache_dir=None,
+    experiment_name=None,
+    pipeline_run_id=None,
+    run_id=None,
+):
+    """
+    Treina localmente um modelo XGBoost com memória externa, sem carregar os dados inteiros em memória.
+
+    Os dados de treino e validação (saídas de `preprocess`) são lidos bloco a bloco por um iterador de dados
+    do XGBoost e mantidos em um cache em disco; o treinamento usa `tree_method="hist"` com todos os núcleos.
+    O modelo é salvo no mesmo formato .tar.gz do job de treinamento do SageMaker, então pode ser passado
+    diretamente para `evaluate` e para o restante do pipeline.
+
+    Args:
+        train_data_s3_path (str | list): Caminho dos dados de treinamento (arquivo, diretório local ou prefixo S3 de shards, ou lista).
+        validation_data_s3_path (str | list): Caminho dos dados de validação.
+        output_s3_prefix (str): Prefixo S3 (ou local) para salvar o artefato do modelo.
+        tracking_server_arn (str): ARN do servidor de rastreamento MLflow.
+        hyperparameters (dict, opcional): Hiperparâmetros que substituem os de XGB_HYPERPARAMETERS.
+        chunk_size (int, opcional): Número de linhas lidas por bloco.
+        nthread (int, opcional): Número de threads; por padrão, todos os núcleos disponíveis.
+        cache_dir (str, opcional): Diretório para o cache da memória externa; por padrão, um diretório temporário.
+        experiment_name (str, opcional): Nome do experimento MLflow.
+        pipeline_run_id (str, opcional): ID da execução do pipeline MLflow.
+        run_id (str, opcional): ID da execução MLflow.
+
+    Returns:
+        dict: Caminho do modelo e informações do treinamento e do MLflow.
+    """
+    try:
+        # Gera um sufixo único baseado no tempo atual
+        suffix = strftime('%d-%H-%M-%S', gmtime())
+
+        # Configura o servidor de rastreamento MLflow
+        mlflow.set_tracking_uri(tracking_server_arn)
+
+        # Configura ou cria um experimento MLflow
+        experiment = mlflow.set_experiment(experiment_name=experiment_name if experiment_name else f"{train.__name__ }-{suffix}")
+
+        # Inicia uma execução de pipeline MLflow, se fornecido um ID
+        pipeline_run = mlflow.start_run(run_id=pipeline_run_id) if pipeline_run_id else None
+
+        # Inicia uma execução MLflow para este treinamento
+        run = mlflow.start_run(run_id=run_id) if run_id else mlflow.start_run(run_name=f"training-{suffix}", nested=True)
+
+        # Separa os parâmetros de treinamento dos parâmetros do booster
+        params = {**XGB_HYPERPARAMETERS, **(hyperparameters or {})}
+        mlflow.log_params(params)
+        num_round = int(params.pop("num_round"))
+        early_stopping_rounds = params.pop("early_stopping_rounds", None)
+        nthread = nthread or os.cpu_count()
+        params.update({"tree_method": "hist", "nthread": nthread})
+
+        with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_cache_dir:
+            # Constrói as matrizes de memória externa; a validação reutiliza os quantis do treino
+            dtrain = build_external_memory_dmatrix(train_data_s3_path, tmp_cache_dir, "train", chunk_size, nthread=nthread)
+            dvalidation = build_external_memory_dmatrix(validation_data_s3_path, tmp_cache_dir, "validation", chunk_size, ref=dtrain, nthread=nthread)
+
+            print(f"## Treinamento > treino:{(dtrain.num_row(), dtrain.num_col())} | validação:{(dvalidation.num_row(), dvalidation.num_col())}")
+
+            booster = xgb.train(
+                params,
+                dtrain,
+                num_boost_round=num_round,
+                evals=[(dtrain, "train"), (dvalidation, "validation")],
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=params.get("verbosity", 1) > 0,
+            )
+
+        # Registra as métricas de validação no MLflow
+        eval_metric = params["eval_metric"]
+        best_score = float(booster.best_score) if early_stopping_rounds else None
+        if best_score is not None:
+            mlflow.log_metrics({f"validation_{eval_metric}": best_score, "best_iteration": booster.best_iteration})
+
+        # Salva o artefato do modelo
+        model_data = save_model_artifact(booster, f"{output_s3_prefix}/model/model.tar.gz")
+
+        print(f"## Treinamento concluído. Modelo salvo em {model_data}")
+
+        return {
+            "model_data": model_data,
+            "best_iteration": booster.best_iteration if early_stopping_rounds else num_round - 1,
+            f"validation_{eval_metric}": best_score,
+            "experiment_name": experiment.name,
+            "pipeline_run_id": pipeline_run.info.run_id if pipeline_run else ''
+        }
+
+    except Exception as e:
+        print(f"Exceção no script de processamento: {e}")
+        raise e
+    finally:
+        # Finaliza a execução MLflow
+        mlflow.end_run()
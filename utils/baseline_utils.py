@@ -0,0 +1,307 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from utils.sketches import MomentsSketch, KLLSketch, HyperLogLog, hash_values
+from utils.storage_utils import list_shards, open_uri
+
+# Número de buckets da distribuição KLL em statistics.json (o mesmo usado pelo SageMaker Model Monitor)
+KLL_BUCKETS = 10
+
+# Colunas de texto com até este número de valores distintos recebem uma restrição de domínio
+MAX_DOMAIN_VALUES = 100
+
+# Acima deste número de valores distintos, a contagem exata por valor de colunas de texto é descartada
+MAX_TRACKED_VALUES = 1000
+
+
+class ColumnSketch:
+    """
+    Estatísticas mergeáveis de uma coluna: completude, contagem por tipo inferido, momentos e
+    quantis (KLL), valores distintos (HyperLogLog) e, para blocos lidos como texto, a contagem exata por valor.
+    Os valores distintos de blocos lidos como números são contados pelo seu texto, como nos blocos de texto,
+    para que uma coluna String tenha a mesma contagem independentemente de onde os blocos são divididos.
+
+    Args:
+        name (str): Nome da coluna.
+        index (int, opcional): Posição da coluna.
+        shard_index (int, opcional): Posição do shard. Junto com `index`, forma a semente do KLL: a mesma linha
+            de base produz sempre o mesmo statistics.json e cada shard compacta com escolhas independentes.
+    """
+
+    def __init__(self, name, index=0, shard_index=0):
+        self.name = name
+        self.num_present = 0
+        self.num_missing = 0
+        self.type_counts = {"Integral": 0, "Fractional": 0, "String": 0}
+        self.moments = MomentsSketch()
+        self.kll = KLLSketch(seed=[shard_index, index])
+        self.hll = HyperLogLog()
+        self.value_counts = {}
+
+    def _update_numeric(self, values):
+        self.moments.update(values)
+        self.kll.update(values)
+
+    def update(self, column):
+        """
+        Atualiza as estatísticas com um bloco da coluna.
+
+        Args:
+            column (pandas.Series): Bloco lido com tipos anuláveis (Int64, Float64 ou texto).
+        """
+        present = column.notna()
+        n_present = int(present.sum())
+        self.num_present += n_present
+        self.num_missing += len(column) - n_present
+
+        if pd.api.types.is_integer_dtype(column.dtype) or pd.api.types.is_float_dtype(column.dtype):
+            kind = "Integral" if pd.api.types.is_integer_dtype(column.dtype) else "Fractional"
+            self.type_counts[kind] += n_present
+            self._update_numeric(column[present].to_numpy(dtype=np.float64))
+            # Somente os valores únicos do bloco são convertidos em texto
+            self.hll.update(hash_values(column[present].drop_duplicates().astype(str).to_numpy(dtype=object)))
+            return
+
+        # Coluna com texto: separa valores numéricos (inteiros ou fracionários) de strings
+        text = column[present].astype(str)
+        numeric = pd.to_numeric(text, errors="coerce")
+        is_string = numeric.isna()
+        is_integral = ~is_string & text.str.fullmatch(r"\s*[+-]?\d+\s*")
+        self.type_counts["String"] += int(is_string.sum())
+        self.type_counts["Integral"] += int(is_integral.sum())
+        self.type_counts["Fractional"] += int((~is_string & ~is_integral).sum())
+        self._update_numeric(numeric[~is_string].to_numpy(dtype=np.float64))
+
+        # Em colunas mistas, os valores numéricos também contam como valores distintos da coluna String
+        self.hll.update(hash_values(text.to_numpy(dtype=object)))
+        if self.value_counts is not None:
+            for value, count in text.value_counts().items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + int(count)
+            if len(self.value_counts) > MAX_TRACKED_VALUES:
+                self.value_counts = None
+
+    def merge(self, other):
+        self.num_present += other.num_present
+        self.num_missing += other.num_missing
+        for kind, count in other.type_counts.items():
+            self.type_counts[kind] += count
+        self.moments.merge(other.moments)
+        self.kll.merge(other.kll)
+        self.hll.merge(other.hll)
+        if self.value_counts is None or other.value_counts is None:
+            self.value_counts = None
+        else:
+            for value, count in other.value_counts.items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > MAX_TRACKED_VALUES:
+                self.value_counts = None
+        return self
+
+    @property
+    def inferred_type(self):
+        # Uma única string torna a coluna String; um único valor fracionário a torna Fractional
+        for kind in ["String", "Fractional", "Integral"]:
+            if self.type_counts[kind]:
+                return kind
+        return "Unknown"
+
+    @property
+    def categorical_counts(self):
+        # Contagem por valor, somente se cobrir todos os valores presentes (blocos lidos como números não são contados)
+        if self.value_counts and sum(self.value_counts.values()) == self.num_present:
+            return self.value_counts
+        return None
+
+    @property
+    def completeness(self):
+        total = self.num_present + self.num_missing
+        return self.num_present / total if total else 0.0
+
+
+def sketch_shard(shard_path, header=False, chunk_size=500_000, shard_index=0):
+    """
+    Lê um shard CSV uma única vez, bloco a bloco, e retorna os sketches das suas colunas.
+
+    Args:
+        shard_path (str): Caminho S3 ou local do arquivo CSV.
+        header (bool, opcional): Se o arquivo tem cabeçalho. Sem cabeçalho, as colunas se chamam _c0, _c1, ...
+        chunk_size (int, opcional): Número de linhas por bloco.
+        shard_index (int, opcional): Posição do shard na linha de base, usada na semente dos sketches KLL.
+
+    Returns:
+        tuple: (número de linhas, lista de ColumnSketch).
+    """
+    sketches = None
+    item_count = 0
+
+    with open_uri(shard_path) as f:
+        for chunk in pd.read_csv(
+            f, header=0 if header else None, chunksize=chunk_size, dtype_backend="numpy_nullable"
+        ):
+            if sketches is None:
+                names = list(chunk.columns) if header else [f"_c{i}" for i in range(chunk.shape[1])]
+                sketches = [ColumnSketch(name, i, shard_index) for i, name in enumerate(names)]
+            for sketch, (_, column) in zip(sketches, chunk.items()):
+                sketch.update(column)
+            item_count += len(chunk)
+
+    return item_count, sketches or []
+
+
+def merge_sketches(results):
+    """
+    Combina os sketches de vários shards, coluna a coluna.
+
+    Args:
+        results (list): Tuplas (número de linhas, lista de ColumnSketch) retornadas por `sketch_shard`.
+
+    Returns:
+        tuple: (número total de linhas, lista de ColumnSketch combinados).
+    """
+    item_count, sketches = 0, None
+    for count, shard_sketches in results:
+        item_count += count
+        if not shard_sketches:
+            continue
+        if sketches is None:
+            sketches = shard_sketches
+            continue
+        if len(shard_sketches) != len(sketches):
+            raise ValueError(f"Shards com números de colunas diferentes: {len(sketches)} e {len(shard_sketches)}")
+        for sketch, other in zip(sketches, shard_sketches):
+            sketch.merge(other)
+    return item_count, sketches or []
+
+
+def build_statistics(item_count, sketches):
+    """
+    Monta o conteúdo de statistics.json no formato do SageMaker Model Monitor.
+    """
+    features = []
+    for s in sketches:
+        common = {"num_present": s.num_present, "num_missing": s.num_missing}
+        feature = {"name": s.name, "inferred_type": s.inferred_type}
+
+        if s.inferred_type in ["Integral", "Fractional"]:
+            feature["numerical_statistics"] = {
+                "common": common,
+                "mean": s.moments.mean,
+                "sum": s.moments.sum,
+                "std_dev": s.moments.std_dev,
+                "min": float(s.moments.min),
+                "max": float(s.moments.max),
+                "distribution": {
+                    "kll": {
+                        "buckets": s.kll.histogram(KLL_BUCKETS, s.moments.min, s.moments.max),
+                        "sketch": s.kll.to_dict(),
+                    }
+                },
+            }
+        else:
+            string_statistics = {"common": common, "distinct_count": float(s.hll.count())}
+            if s.categorical_counts:
+                string_statistics["distribution"] = {
+                    "categorical": {
+                        "buckets": [{"value": v, "count": c} for v, c in sorted(s.categorical_counts.items(), key=lambda i: -i[1])]
+                    }
+                }
+            feature["string_statistics"] = string_statistics
+
+        features.append(feature)
+
+    return {"version": 0.0, "dataset": {"item_count": item_count}, "features": features}
+
+
+def build_constraints(sketches):
+    """
+    Monta o conteúdo de constraints.json no formato do SageMaker Model Monitor: tipo inferido, completude,
+    não negatividade para colunas numéricas e domínio para colunas de texto com poucos valores distintos.
+    """
+    features = []
+    for s in sketches:
+        feature = {"name": s.name, "inferred_type": s.inferred_type, "completeness": s.completeness}
+
+        if s.inferred_type in ["Integral", "Fractional"]:
+            feature["num_constraints"] = {"is_non_negative": bool(s.moments.min >= 0)}
+        elif s.categorical_counts and len(s.categorical_counts) <= MAX_DOMAIN_VALUES:
+            feature["string_constraints"] = {"domains": sorted(s.categorical_counts)}
+
+        features.append(feature)
+
+    return {
+        "version": 0.0,
+        "features": features,
+        "monitoring_config": {
+            "evaluate_constraints": "Enabled",
+            "emit_metrics": "Enabled",
+            "datatype_check_threshold": 1.0,
+            "domain_content_threshold": 1.0,
+            "distribution_constraints": {
+                "perform_comparison": "Enabled",
+                "comparison_threshold": 0.1,
+                "comparison_method": "Robust",
+            },
+        },
+    }
+
+
+def write_json(content, output_path):
+    """
+    Grava um dicionário como JSON em um URI S3, URI file:// ou caminho local.
+    """
+    with open_uri(output_path, "w") as f:
+        json.dump(content, f)
+    return output_path
+
+
+def generate_baseline(
+    baseline_data_path,
+    output_path,
+    header=False,
+    chunk_size=500_000,
+    n_jobs=None,
+):
+    """
+    Gera statistics.json e constraints.json da linha de base em uma única passagem pelos dados,
+    substituindo o job de container `suggest_baseline`.
+
+    Cada shard é lido uma vez, bloco a bloco, atualizando sketches mergeáveis por coluna; os shards são
+    processados em paralelo e os sketches combinados no final. Os arquivos gerados podem ser passados como
+    `statistics_path` e `constraints_path` para `run_model_monitor_job`.
+
+    Args:
+        baseline_data_path (str | list): Linha de base gerada por `preprocess` (arquivo, diretório local ou prefixo S3 de shards, ou lista).
+        output_path (str): Prefixo S3 ou diretório local onde os arquivos JSON são gravados.
+        header (bool, opcional): Se os arquivos têm cabeçalho; a linha de base de `preprocess` não tem.
+        chunk_size (int, opcional): Número de linhas por bloco lido.
+        n_jobs (int, opcional): Número de processos; por padrão, um por shard até o número de núcleos.
+
+    Returns:
+        dict: Caminhos de statistics.json e constraints.json e o número de linhas processadas.
+    """
+    shards = list_shards(baseline_data_path)
+    n_jobs = n_jobs or min(len(shards), os.cpu_count())
+
+    if n_jobs > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(
+                sketch_shard, shards, [header] * len(shards), [chunk_size] * len(shards), range(len(shards))
+            ))
+    else:
+        results = [sketch_shard(shard, header, chunk_size, i) for i, shard in enumerate(shards)]
+
+    item_count, sketches = merge_sketches(results)
+
+    statistics_path = write_json(build_statistics(item_count, sketches), f"{output_path}/statistics.json")
+    constraints_path = write_json(build_constraints(sketches), f"{output_path}/constraints.json")
+
+    print(f"## Linha de base > {item_count} linhas | {len(sketches)} colunas | {len(shards)} shards")
+
+    return {
+        "statistics": statistics_path,
+        "constraints": constraints_path,
+        "item_count": item_count,
+    }
@@ -0,0 +1,423 @@
+import numpy as np
+import pandas as pd
+
+from utils.storage_utils import list_shards, open_uri, read_csv
+
+# Número de intervalos de score usados nos histogramas por classe; a AUC é calculada sobre eles
+N_SCORE_BINS = 1000
+
+# Número de intervalos da curva de calibração (deve dividir N_SCORE_BINS)
+N_CALIBRATION_BINS = 10
+
+# Métricas em que valores maiores são melhores; nas demais (false_positive_rate, log_loss, brier_score, ece),
+# menores são melhores
+HIGHER_IS_BETTER = ["auc", "accuracy", "precision", "recall", "f1", "true_positive_rate"]
+
+# Número de registros JSON lidos por bloco; somente as colunas extraídas de cada bloco são mantidas
+CHUNK_SIZE = 200_000
+
+
+def _read_json_lines(paths, extract, chunk_size=CHUNK_SIZE):
+    # Lê os arquivos bloco a bloco, aplicando `extract` a cada bloco para descartar os registros aninhados
+    frames = []
+    for path in list_shards(paths, suffix=".jsonl"):
+        with open_uri(path, "r") as f, pd.read_json(f, lines=True, dtype=False, chunksize=chunk_size) as reader:
+            frames.extend(extract(chunk) for chunk in reader)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _extract_predictions(df):
+    metadata = df["eventMetadata"]
+    output = df["captureData"].str.get("endpointOutput")
+
+    return pd.DataFrame({
+        "inference_id": metadata.str.get("inferenceId").fillna(metadata.str.get("eventId")),
+        "inference_time": pd.to_datetime(metadata.str.get("inferenceTime"), utc=True),
+        "probability": pd.to_numeric(output.str.get("data").str.strip()).astype(np.float64),
+    })
+
+
+def _extract_ground_truth(df):
+    return pd.DataFrame({
+        "inference_id": df["eventMetadata"].str.get("eventId"),
+        "label": pd.to_numeric(df["groundTruthData"].str.get("data").str.strip()).astype(np.int8),
+    })
+
+
+def read_capture_predictions(capture_paths, chunk_size=CHUNK_SIZE):
+    """
+    Lê arquivos de captura de dados do endpoint (JSON Lines) e extrai as previsões.
+
+    A chave de junção é o `inferenceId` do evento, quando presente, ou o `eventId`, como no job de
+    mesclagem do SageMaker Model Monitor.
+
+    Args:
+        capture_paths (str | list): Arquivo de captura, lista de arquivos, diretório local ou prefixo S3 terminado em "/".
+        chunk_size (int, opcional): Número de registros lidos por bloco.
+
+    Returns:
+        pandas.DataFrame: Colunas `inference_id`, `inference_time` e `probability`.
+    """
+    return _read_json_lines(capture_paths, _extract_predictions, chunk_size)
+
+
+def read_ground_truth(ground_truth_paths, chunk_size=CHUNK_SIZE):
+    """
+    Lê arquivos de rótulos verdadeiros (ground truth) no formato aceito pelo Model Monitor.
+
+    Args:
+        ground_truth_paths (str | list): Arquivo JSON Lines, lista de arquivos, diretório local ou prefixo S3 terminado em "/".
+        chunk_size (int, opcional): Número de registros lidos por bloco.
+
+    Returns:
+        pandas.DataFrame: Colunas `inference_id` e `label`.
+    """
+    return _read_json_lines(ground_truth_paths, _extract_ground_truth, chunk_size)
+
+
+class QualityAggregate:
+    """
+    Agregados incrementais e mergeáveis de qualidade de um classificador binário: matriz de confusão,
+    histogramas de score por classe (para a AUC), soma das probabilidades por intervalo (para a calibração),
+    log loss e Brier score.
+
+    Args:
+        threshold (float, opcional): Limiar de decisão. Com 0.5, equivale ao `np.round(probability)` de `evaluate`.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self.positive_hist = np.zeros(N_SCORE_BINS, dtype=np.int64)
+        self.negative_hist = np.zeros(N_SCORE_BINS, dtype=np.int64)
+        self.probability_sum = np.zeros(N_SCORE_BINS, dtype=np.float64)
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # [rótulo, previsão]
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+
+    def update(self, probability, label):
+        """
+        Adiciona um bloco de pares (probabilidade, rótulo).
+
+        Args:
+            probability (numpy.ndarray): Probabilidades previstas da classe positiva.
+            label (numpy.ndarray): Rótulos verdadeiros (0 ou 1).
+        """
+        probability = np.asarray(probability, dtype=np.float64)
+        label = np.asarray(label, dtype=np.int64)
+        bins = np.minimum((probability * N_SCORE_BINS).astype(np.int64), N_SCORE_BINS - 1)
+
+        self.positive_hist += np.bincount(bins[label == 1], minlength=N_SCORE_BINS)
+        self.negative_hist += np.bincount(bins[label == 0], minlength=N_SCORE_BINS)
+        self.probability_sum += np.bincount(bins, weights=probability, minlength=N_SCORE_BINS)
+
+        prediction = (probability > self.threshold).astype(np.int64)
+        self.confusion += np.bincount(label * 2 + prediction, minlength=4).reshape(2, 2)
+
+        clipped = np.clip(probability, 1e-15, 1 - 1e-15)
+        self.log_loss_sum -= np.sum(label * np.log(clipped) + (1 - label) * np.log(1 - clipped))
+        self.brier_sum += np.sum((probability - label) ** 2)
+
+    def merge(self, other):
+        self.positive_hist += other.positive_hist
+        self.negative_hist += other.negative_hist
+        self.probability_sum += other.probability_sum
+        self.confusion += other.confusion
+        self.log_loss_sum += other.log_loss_sum
+        self.brier_sum += other.brier_sum
+        return self
+
+    @property
+    def count(self):
+        return int(self.confusion.sum())
+
+    def auc(self):
+        # Mann-Whitney sobre os scores agrupados: pares no mesmo intervalo contam como empate (meio acerto)
+        positives, negatives = self.positive_hist.sum(), self.negative_hist.sum()
+        if positives == 0 or negatives == 0:
+            return np.nan
+        positives_above = np.cumsum(self.positive_hist[::-1])[::-1] - self.positive_hist
+        return float(np.sum(self.negative_hist * (positives_above + 0.5 * self.positive_hist)) / (positives * negatives))
+
+    def calibration(self):
+        """
+        Returns:
+            pandas.DataFrame: Por intervalo de probabilidade, contagem, probabilidade média prevista e fração de positivos.
+        """
+        shape = (N_CALIBRATION_BINS, N_SCORE_BINS // N_CALIBRATION_BINS)
+        positives = self.positive_hist.reshape(shape).sum(axis=1)
+        count = positives + self.negative_hist.reshape(shape).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "lower_bound": np.arange(N_CALIBRATION_BINS) / N_CALIBRATION_BINS,
+                "upper_bound": np.arange(1, N_CALIBRATION_BINS + 1) / N_CALIBRATION_BINS,
+                "count": count,
+                "mean_predicted": self.probability_sum.reshape(shape).sum(axis=1) / count,
+                "fraction_positive": positives / count,
+            })
+
+    def metrics(self):
+        """
+        Returns:
+            dict: Métricas de qualidade acumuladas até o momento.
+        """
+        n = self.count
+        (tn, fp), (fn, tp) = self.confusion
+        precision = tp / (tp + fp) if tp + fp else np.nan
+        recall = tp / (tp + fn) if tp + fn else np.nan
+        calibration = self.calibration()
+
+        return {
+            "count": n,
+            "auc": self.auc(),
+            "accuracy": (tp + tn) / n if n else np.nan,
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else np.nan,
+            "true_positive_rate": recall,
+            "false_positive_rate": fp / (fp + tn) if fp + tn else np.nan,
+            "log_loss": self.log_loss_sum / n if n else np.nan,
+            "brier_score": self.brier_sum / n if n else np.nan,
+            # Erro de calibração esperado: diferença média, ponderada pela contagem, entre previsto e observado
+            "ece": float(np.nansum(np.abs(calibration["mean_predicted"] - calibration["fraction_positive"]) * calibration["count"]) / n) if n else np.nan,
+            "confusion_matrix": {"tn": int(tn), "fp": int(fp), "fn": int(fn), "tp": int(tp)},
+        }
+
+
+def baseline_metrics(prediction_baseline_path, threshold=0.5):
+    """
+    Calcula as métricas de referência a partir do prediction_baseline.csv gerado por `evaluate`,
+    com os mesmos agregados usados nas janelas de monitoramento.
+
+    Args:
+        prediction_baseline_path (str): Caminho S3 ou local do prediction_baseline.csv.
+        threshold (float, opcional): Limiar de decisão.
+
+    Returns:
+        dict: Métricas de qualidade do conjunto de teste.
+    """
+    df = read_csv(prediction_baseline_path, usecols=["probability", "label"])
+    aggregate = QualityAggregate(threshold)
+    aggregate.update(df["probability"].to_numpy(), df["label"].to_numpy())
+    return aggregate.metrics()
+
+
+class ModelQualityEngine:
+    """
+    Junta previsões capturadas do endpoint com rótulos verdadeiros que chegam depois e mantém métricas de
+    qualidade incrementais por janela de tempo da inferência.
+
+    A junção é um hash join simétrico sobre o ID da inferência: previsões e rótulos sem par ficam pendentes,
+    indexados por ID (pandas.Index), até que o outro lado chegue, em qualquer ordem e em qualquer número de lotes.
+
+    Para que os pendentes não cresçam sem limite, o tempo é medido pela maior `inference_time` já vista (marca
+    d'água): previsões mais antigas que a marca d'água menos `max_label_delay`, e rótulos que esperam uma
+    previsão há mais que `max_label_delay`, são descartados e contados em `dropped_predictions` e `dropped_labels`.
+
+    Args:
+        window (str, opcional): Tamanho da janela de tempo (frequência do pandas, por exemplo "1h" ou "1D").
+        threshold (float, opcional): Limiar de decisão.
+        baseline (dict, opcional): Métricas de referência, por exemplo de `baseline_metrics`.
+        max_label_delay (str, opcional): Atraso máximo entre uma inferência e o seu rótulo (por exemplo "7D");
+            None mantém os pendentes indefinidamente.
+    """
+
+    def __init__(self, window="1h", threshold=0.5, baseline=None, max_label_delay="7D"):
+        self.window = window
+        self.threshold = threshold
+        self.baseline = baseline
+        self.max_label_delay = pd.Timedelta(max_label_delay) if max_label_delay is not None else None
+        self.aggregates = {}
+        self.watermark = pd.NaT
+        self.dropped_predictions = 0
+        self.dropped_labels = 0
+        self.pending_predictions = pd.DataFrame(
+            {"inference_time": pd.Series(dtype="datetime64[ns, UTC]"), "probability": pd.Series(dtype=np.float64)},
+            index=pd.Index([], dtype=object, name="inference_id"),
+        )
+        # arrival_watermark: marca d'água no momento em que o rótulo chegou
+        self.pending_labels = pd.DataFrame(
+            {"label": pd.Series(dtype=np.int8), "arrival_watermark": pd.Series(dtype="datetime64[ns, UTC]")},
+            index=pd.Index([], dtype=object, name="inference_id"),
+        )
+
+    @staticmethod
+    def _drop_duplicates(df):
+        # Um reenvio com o mesmo ID substitui o anterior
+        return df[~df.index.duplicated(keep="last")]
+
+    def _update(self, matched):
+        windows = matched["inference_time"].dt.floor(self.window)
+        for window, positions in matched.groupby(windows, dropna=False).indices.items():
+            rows = matched.iloc[positions]
+            aggregate = self.aggregates.setdefault(window, QualityAggregate(self.threshold))
+            aggregate.update(rows["probability"].to_numpy(), rows["label"].to_numpy())
+
+    def add_predictions(self, predictions):
+        """
+        Adiciona um lote de previsões (por exemplo, de `read_capture_predictions`).
+
+        Args:
+            predictions (pandas.DataFrame): Colunas `inference_id`, `inference_time` e `probability`.
+
+        Returns:
+            int: Número de previsões que encontraram um rótulo pendente.
+        """
+        predictions = self._drop_duplicates(predictions.set_index("inference_id")[["inference_time", "probability"]])
+        latest = predictions["inference_time"].max()
+        if pd.notna(latest) and (pd.isna(self.watermark) or latest > self.watermark):
+            self.watermark = latest
+        positions = self.pending_labels.index.get_indexer(predictions.index)
+        found = positions >= 0
+
+        if found.any():
+            matched = predictions[found].assign(label=self.pending_labels["label"].to_numpy()[positions[found]])
+            self._update(matched)
+            keep = np.ones(len(self.pending_labels), dtype=bool)
+            keep[positions[found]] = False
+            self.pending_labels = self.pending_labels[keep]
+
+        self.pending_predictions = self._drop_duplicates(pd.concat([self.pending_predictions, predictions[~found]]))
+        return int(found.sum())
+
+    def add_ground_truth(self, ground_truth):
+        """
+        Adiciona um lote de rótulos verdadeiros (por exemplo, de `read_ground_truth`) e, em seguida, descarta
+        os pendentes que excederam `max_label_delay` (ver `evict`).
+
+        Args:
+            ground_truth (pandas.DataFrame): Colunas `inference_id` e `label`.
+
+        Returns:
+            int: Número de rótulos que encontraram uma previsão pendente.
+        """
+        labels = self._drop_duplicates(ground_truth.set_index("inference_id")["label"].astype(np.int8))
+        positions = self.pending_predictions.index.get_indexer(labels.index)
+        found = positions >= 0
+
+        if found.any():
+            matched = self.pending_predictions.iloc[positions[found]].assign(label=labels.to_numpy()[found])
+            self._update(matched)
+            keep = np.ones(len(self.pending_predictions), dtype=bool)
+            keep[positions[found]] = False
+            self.pending_predictions = self.pending_predictions[keep]
+
+        unmatched = labels[~found].to_frame()
+        unmatched["arrival_watermark"] = pd.Series(self.watermark, index=unmatched.index, dtype="datetime64[ns, UTC]")
+        self.pending_labels = self._drop_duplicates(pd.concat([self.pending_labels, unmatched]))
+        self.evict()
+        return int(found.sum())
+
+    def evict(self):
+        """
+        Descarta as previsões pendentes com `inference_time` anterior à marca d'água menos `max_label_delay`
+        e os rótulos pendentes que chegaram antes desse limite. É chamado ao final de `add_ground_truth`, depois
+        da junção, e não em `add_predictions`, para que um lote de previsões não descarte previsões cujos
+        rótulos ainda não foram adicionados.
+
+        Returns:
+            tuple: Número de previsões e de rótulos descartados nesta chamada.
+        """
+        if self.max_label_delay is None or pd.isna(self.watermark):
+            return 0, 0
+        cutoff = self.watermark - self.max_label_delay
+
+        # Rótulos que chegaram antes da primeira previsão contam a partir da marca d'água atual
+        arrival = self.pending_labels["arrival_watermark"].fillna(self.watermark)
+        self.pending_labels = self.pending_labels.assign(arrival_watermark=arrival)
+
+        expired_predictions = (self.pending_predictions["inference_time"] < cutoff).to_numpy()
+        expired_labels = (arrival < cutoff).to_numpy()
+        self.pending_predictions = self.pending_predictions[~expired_predictions]
+        self.pending_labels = self.pending_labels[~expired_labels]
+
+        dropped = int(expired_predictions.sum()), int(expired_labels.sum())
+        self.dropped_predictions += dropped[0]
+        self.dropped_labels += dropped[1]
+        return dropped
+
+    def window_metrics(self):
+        """
+        Returns:
+            pandas.DataFrame: Métricas por janela (índice: início da janela).
+        """
+        rows = {window: aggregate.metrics() for window, aggregate in sorted(self.aggregates.items())}
+        return pd.DataFrame.from_dict(rows, orient="index").rename_axis("window_start")
+
+    def violations(self, tolerance=0.05, min_count=100):
+        """
+        Compara as métricas de cada janela com a linha de base, no formato de violações do Model Monitor.
+
+        Args:
+            tolerance (float, opcional): Diferença absoluta tolerada em relação à linha de base.
+            min_count (int, opcional): Janelas com menos pares previsão/rótulo são ignoradas.
+
+        Returns:
+            list: Violações com `window_start`, `metric_name`, `constraint_check_type` e `description`.
+        """
+        if self.baseline is None:
+            raise ValueError("Nenhuma linha de base informada para comparação")
+
+        violations = []
+        for window, aggregate in sorted(self.aggregates.items()):
+            if aggregate.count < min_count:
+                continue
+            for metric, value in aggregate.metrics().items():
+                reference = self.baseline.get(metric)
+                if metric == "count" or not isinstance(value, float) or reference is None or np.isnan(value):
+                    continue
+                if metric in HIGHER_IS_BETTER:
+                    check, threshold, violated = "LessThanThreshold", reference - tolerance, value < reference - tolerance
+                else:
+                    check, threshold, violated = "GreaterThanThreshold", reference + tolerance, value > reference + tolerance
+                if violated:
+                    violations.append({
+                        "window_start": str(window),
+                        "metric_name": metric,
+                        "constraint_check_type": check,
+                        "description": f"Metric {metric} with {value:.4f} was {check} '{threshold:.4f}'",
+                    })
+        return violations
+
+
+def evaluate_model_quality(
+    capture_paths,
+    ground_truth_paths,
+    prediction_baseline_path=None,
+    window="1h",
+    threshold=0.5,
+    tolerance=0.05,
+    max_label_delay="7D",
+):
+    """
+    Executa o monitoramento de qualidade do modelo localmente: junta as capturas do endpoint com os rótulos
+    verdadeiros, calcula as métricas por janela e compara com a linha de base de `evaluate`.
+
+    Args:
+        capture_paths (str | list): Arquivos de captura de dados (JSON Lines).
+        ground_truth_paths (str | list): Arquivos de rótulos verdadeiros (JSON Lines).
+        prediction_baseline_path (str, opcional): prediction_baseline.csv gerado por `evaluate`.
+        window (str, opcional): Tamanho da janela de tempo.
+        threshold (float, opcional): Limiar de decisão.
+        tolerance (float, opcional): Diferença absoluta tolerada em relação à linha de base.
+        max_label_delay (str, opcional): Atraso máximo entre uma inferência e o seu rótulo.
+
+    Returns:
+        dict: Métricas por janela, violações e número de previsões e rótulos ainda sem par e descartados.
+    """
+    engine = ModelQualityEngine(
+        window=window,
+        threshold=threshold,
+        max_label_delay=max_label_delay,
+        baseline=baseline_metrics(prediction_baseline_path, threshold) if prediction_baseline_path else None,
+    )
+    engine.add_predictions(read_capture_predictions(capture_paths))
+    engine.add_ground_truth(read_ground_truth(ground_truth_paths))
+
+    return {
+        "window_metrics": engine.window_metrics(),
+        "violations": engine.violations(tolerance) if engine.baseline else [],
+        "pending_predictions": len(engine.pending_predictions),
+        "pending_labels": len(engine.pending_labels),
+        "dropped_predictions": engine.dropped_predictions,
+        "dropped_labels": engine.dropped_labels,
+    }
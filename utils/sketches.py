@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+# Sketches mergeáveis usados para calcular estatísticas de colunas em uma única passagem pelos dados.
+# Cada sketch é atualizado bloco a bloco (operações vetorizadas com NumPy) e dois sketches do mesmo
+# tipo podem ser combinados com `merge`, o que permite processar shards em paralelo.
+
+
+class MomentsSketch:
+    """
+    Contagem, soma, mínimo, máximo, média e variância, combinados pelo método de Chan et al.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count, total, mean, m2, vmin, vmax):
+        if count == 0:
+            return
+        n = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / n
+        self.m2 += m2 + delta ** 2 * self.count * count / n
+        self.count = n
+        self.sum += total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    def update(self, values):
+        """
+        Adiciona um bloco de valores (sem valores ausentes).
+
+        Args:
+            values (numpy.ndarray): Valores numéricos.
+        """
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        mean = values.mean()
+        self._combine(len(values), values.sum(), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, other):
+        self._combine(other.count, other.sum, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def std_dev(self):
+        # Desvio padrão populacional, como nas estatísticas do SageMaker Model Monitor
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+
+class KLLSketch:
+    """
+    Sketch de quantis KLL (Karnin, Lang e Liberty). Mantém compactadores por nível: um item no nível h
+    representa 2**h valores. Quando um nível excede sua capacidade, ele é ordenado e metade dos itens
+    (posições pares ou ímpares, escolhidas ao acaso) sobe para o nível seguinte.
+
+    Args:
+        k (int, opcional): Capacidade do nível mais alto; controla a precisão.
+        c (float, opcional): Fator de redução da capacidade a cada nível abaixo do mais alto.
+        seed (int, opcional): Semente para a escolha das posições promovidas.
+    """
+
+    def __init__(self, k=2048, c=0.64, seed=None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * self.c ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # Com um número ímpar de itens, o maior permanece no nível atual
+                leftover = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """
+        Adiciona um bloco de valores (sem valores ausentes).
+
+        Args:
+            values (numpy.ndarray): Valores numéricos.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def weighted_items(self):
+        """
+        Returns:
+            tuple: (itens, pesos) de todos os níveis.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** h, dtype=np.float64) for h, level_items in enumerate(self.levels)])
+        return items, weights
+
+    def quantile(self, q):
+        """
+        Estima o quantil q (0 <= q <= 1).
+        """
+        items, weights = self.weighted_items()
+        if len(items) == 0:
+            return np.nan
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        return float(items[order][np.searchsorted(cumulative, q * cumulative[-1], side="left").clip(max=len(items) - 1)])
+
+    def histogram(self, n_buckets, vmin, vmax):
+        """
+        Estima as contagens em `n_buckets` intervalos de mesma largura entre vmin e vmax.
+
+        Returns:
+            list: Buckets no formato {"lower_bound", "upper_bound", "count"}.
+        """
+        items, weights = self.weighted_items()
+        counts, edges = np.histogram(items, bins=n_buckets, range=(vmin, vmax), weights=weights)
+        return [
+            {"lower_bound": float(edges[i]), "upper_bound": float(edges[i + 1]), "count": float(counts[i])}
+            for i in range(n_buckets)
+        ]
+
+    def to_dict(self):
+        return {"parameters": {"c": self.c, "k": float(self.k)}, "data": [level_items.tolist() for level_items in self.levels]}
+
+
+def hash_values(values):
+    """
+    Calcula hashes de 64 bits para os valores distintos de um array numérico ou de strings. Os duplicados
+    são removidos antes (não alteram a estimativa de cardinalidade), o que é muito mais barato para colunas
+    com poucos valores distintos, como as colunas dummy.
+    """
+    return pd.util.hash_array(pd.unique(np.asarray(values)))
+
+
+class HyperLogLog:
+    """
+    Estimador de cardinalidade HyperLogLog com 2**p registradores; o erro relativo típico é 1.04 / sqrt(2**p).
+
+    Args:
+        p (int, opcional): Número de bits do índice do registrador.
+    """
+
+    def __init__(self, p=14):
+        if not 11 <= p <= 18:
+            raise ValueError(f"p deve estar entre 11 e 18, recebido {p}")
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, hashes):
+        """
+        Adiciona um bloco de hashes de 64 bits (ver `hash_values`).
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        w = hashes & np.uint64((1 << (64 - self.p)) - 1)
+
+        # Posição do primeiro bit 1 nos 64 - p bits restantes. Com p >= 11 esses bits cabem na mantissa
+        # do float64, então o expoente de frexp é exatamente o bit_length (0 para w == 0)
+        _, bit_length = np.frexp(w.astype(np.float64))
+        rank = (64 - self.p) - bit_length + 1
+
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m ** 2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Correção para cardinalidades pequenas (contagem linear)
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
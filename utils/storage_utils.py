@@ -0,0 +1,491 @@
+import io
+import os
+import glob
+import shutil
+import threading
+import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import boto3
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
+
+# Camada de armazenamento compartilhada pelas etapas do pipeline. Os mesmos caminhos funcionam com S3
+# (s3://bucket/chave) e com o disco local (file:///caminho ou caminho simples), então o código das etapas
+# roda igual no SageMaker, localmente e nos benchmarks.
+
+# Conexões HTTP mantidas pelo cliente S3 compartilhado; deve ser >= MAX_CONCURRENCY
+MAX_POOL_CONNECTIONS = 64
+
+# Número de partes transferidas em paralelo por objeto
+MAX_CONCURRENCY = 16
+
+# Tamanho de cada parte (multipart upload e leituras por intervalo); o S3 exige no mínimo 5 MiB
+PART_SIZE = 16 * 1024 * 1024
+
+# Objetos a partir deste tamanho são transferidos em partes
+MULTIPART_THRESHOLD = 32 * 1024 * 1024
+
+# Tamanho do buffer dos leitores e escritores (as partes são lidas e enviadas independentemente dele)
+BUFFER_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_session = None
+_client = None
+_pid = None
+
+
+def _reset_after_fork():
+    # Clientes boto3 não podem ser compartilhados entre processos: cada processo cria os seus
+    global _session, _client, _pid
+    if _pid != os.getpid():
+        _session, _client, _pid = None, None, os.getpid()
+
+
+def get_session():
+    """
+    Retorna a sessão boto3 do processo, criada uma única vez.
+
+    Returns:
+        boto3.Session: Sessão compartilhada.
+    """
+    global _session
+    with _lock:
+        _reset_after_fork()
+        if _session is None:
+            _session = boto3.Session()
+        return _session
+
+
+def get_s3_client():
+    """
+    Retorna o cliente S3 do processo, criado uma única vez com um pool de conexões dimensionado para
+    as transferências paralelas. Clientes boto3 são thread-safe, então o mesmo cliente é usado por todas
+    as threads; somente a criação (que usa a sessão) é protegida por um lock.
+
+    Returns:
+        botocore.client.S3: Cliente S3 compartilhado.
+    """
+    global _client
+    session = get_session()
+    with _lock:
+        if _client is None:
+            _client = session.client(
+                "s3",
+                config=Config(
+                    max_pool_connections=MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 10, "mode": "adaptive"},
+                ),
+            )
+        return _client
+
+
+def transfer_config():
+    """
+    Configuração das transferências gerenciadas (upload_file / download_file): multipart upload e
+    download por intervalos paralelos acima de MULTIPART_THRESHOLD.
+    """
+    return TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=PART_SIZE,
+        max_concurrency=MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+def is_s3(uri):
+    return uri.startswith("s3://")
+
+
+def split_s3_uri(uri):
+    """
+    Extrai o nome do bucket e a chave de um URI S3.
+
+    Returns:
+        tuple: (bucket, chave).
+    """
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def local_path(uri):
+    """
+    Converte um URI file:// (ou um caminho simples) em um caminho local.
+    """
+    if uri.startswith("file://"):
+        return uri[len("file://"):]
+    if is_s3(uri):
+        raise ValueError(f"Não é um caminho local: {uri}")
+    return uri
+
+
+def join(prefix, *parts):
+    """
+    Junta um prefixo S3, URI file:// ou diretório local com os componentes seguintes.
+    """
+    return "/".join([prefix.rstrip("/"), *[part.strip("/") for part in parts]])
+
+
+def list_shards(data_path, suffix=".csv"):
+    """
+    Expande o caminho de dados de uma etapa nos arquivos (shards) que o compõem.
+
+    Args:
+        data_path (str | list): Arquivo, lista de caminhos, diretório local ou prefixo S3 terminado em "/".
+        suffix (str, opcional): Extensão dos arquivos procurados em diretórios e prefixos.
+
+    Returns:
+        list: Caminhos dos shards, em ordem.
+    """
+    if isinstance(data_path, (list, tuple)):
+        return list(data_path)
+    if is_s3(data_path):
+        if not data_path.endswith("/"):
+            return [data_path]
+        bucket, prefix = split_s3_uri(data_path)
+        keys = []
+        for page in get_s3_client().get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(o["Key"] for o in page.get("Contents", []) if o["Key"].endswith(suffix))
+        return [f"s3://{bucket}/{key}" for key in sorted(keys)]
+    if os.path.isdir(local_path(data_path)):
+        prefix = "file://" if data_path.startswith("file://") else ""
+        return [prefix + p for p in sorted(glob.glob(os.path.join(local_path(data_path), f"*{suffix}")))]
+    return [data_path]
+
+
+def download_file(uri, path):
+    """
+    Baixa um objeto para um arquivo local; objetos grandes são baixados por intervalos em paralelo.
+
+    Args:
+        uri (str): URI S3, URI file:// ou caminho local de origem.
+        path (str): Caminho local de destino.
+
+    Returns:
+        str: Caminho local de destino.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if is_s3(uri):
+        bucket, key = split_s3_uri(uri)
+        get_s3_client().download_file(bucket, key, path, Config=transfer_config())
+    elif os.path.abspath(local_path(uri)) != os.path.abspath(path):
+        shutil.copyfile(local_path(uri), path)
+    return path
+
+
+def upload_file(path, uri):
+    """
+    Envia um arquivo local; arquivos grandes são enviados com multipart upload em paralelo.
+
+    Args:
+        path (str): Caminho local de origem.
+        uri (str): URI S3, URI file:// ou caminho local de destino.
+
+    Returns:
+        str: URI de destino.
+    """
+    if is_s3(uri):
+        bucket, key = split_s3_uri(uri)
+        get_s3_client().upload_file(path, bucket, key, Config=transfer_config())
+    elif os.path.abspath(local_path(uri)) != os.path.abspath(path):
+        os.makedirs(os.path.dirname(os.path.abspath(local_path(uri))), exist_ok=True)
+        shutil.copyfile(path, local_path(uri))
+    return uri
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    Leitor de um objeto S3 que baixa as próximas partes em paralelo (GET por intervalo) enquanto as
+    anteriores são consumidas. No máximo `max_concurrency` partes ficam em memória. Um `seek` descarta
+    as partes antecipadas e recomeça a partir da nova posição.
+
+    Args:
+        uri (str): URI S3 do objeto.
+        part_size (int, opcional): Tamanho de cada intervalo; por padrão, PART_SIZE.
+        max_concurrency (int, opcional): Número de intervalos baixados antecipadamente; por padrão, MAX_CONCURRENCY.
+    """
+
+    def __init__(self, uri, part_size=None, max_concurrency=None):
+        super().__init__()
+        self._client = get_s3_client()
+        self._bucket, self._key = split_s3_uri(uri)
+        self._size = self._client.head_object(Bucket=self._bucket, Key=self._key)["ContentLength"]
+        self._part_size = part_size or PART_SIZE
+        self._max_concurrency = max_concurrency or MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        self._position = 0
+        self._next_offset = 0
+        self._pending = deque()
+        self._current = memoryview(b"")
+
+    @property
+    def size(self):
+        return self._size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        position = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence] + offset
+        if position < 0:
+            raise ValueError(f"Posição negativa: {position}")
+        if position != self._position:
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._current = memoryview(b"")
+            self._position = self._next_offset = position
+        return position
+
+    def _get_range(self, start, end):
+        response = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={start}-{end - 1}")
+        return response["Body"].read()
+
+    def _schedule(self):
+        while len(self._pending) < self._max_concurrency and self._next_offset < self._size:
+            end = min(self._next_offset + self._part_size, self._size)
+            self._pending.append(self._executor.submit(self._get_range, self._next_offset, end))
+            self._next_offset = end
+
+    def readinto(self, buffer):
+        if not len(self._current):
+            self._schedule()
+            if not self._pending:
+                return 0
+            self._current = memoryview(self._pending.popleft().result())
+            self._schedule()
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        self._position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+        super().close()
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Escritor sequencial para um objeto S3. Os dados são agrupados em partes de `part_size` bytes enviadas
+    em paralelo com multipart upload; objetos menores que uma parte são enviados com um único PUT no `close`.
+    No máximo `max_concurrency` partes ficam em memória.
+
+    O objeto só é criado no `close`; se `abort` for chamado antes, o upload é descartado.
+
+    Args:
+        uri (str): URI S3 do objeto.
+        part_size (int, opcional): Tamanho de cada parte (mínimo de 5 MiB exigido pelo S3); por padrão, PART_SIZE.
+        max_concurrency (int, opcional): Número de partes enviadas em paralelo; por padrão, MAX_CONCURRENCY.
+    """
+
+    def __init__(self, uri, part_size=None, max_concurrency=None):
+        super().__init__()
+        self._client = get_s3_client()
+        self._bucket, self._key = split_s3_uri(uri)
+        self._part_size = part_size or PART_SIZE
+        self._max_concurrency = max_concurrency or MAX_CONCURRENCY
+        self._executor = None
+        self._upload_id = None
+        self._parts = []
+        self._buffer = bytearray()
+        self._failed = False
+
+    def writable(self):
+        return True
+
+    def _upload_part(self, part_number, data):
+        response = self._client.upload_part(
+            Bucket=self._bucket, Key=self._key, UploadId=self._upload_id, PartNumber=part_number, Body=data
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _submit_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(Bucket=self._bucket, Key=self._key)["UploadId"]
+            self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        # Limita as partes em memória: espera a mais antiga antes de enviar mais uma
+        in_flight = [p for p in self._parts if not p.done()]
+        if len(in_flight) >= self._max_concurrency:
+            in_flight[0].result()
+        self._parts.append(self._executor.submit(self._upload_part, len(self._parts) + 1, data))
+
+    def write(self, data):
+        try:
+            self._buffer += data
+            while len(self._buffer) >= self._part_size:
+                self._submit_part(bytes(self._buffer[:self._part_size]))
+                del self._buffer[:self._part_size]
+        except BaseException:
+            # Uma parte perdida invalida o objeto inteiro: o `close` vai abortar em vez de completar o upload
+            self._failed = True
+            raise
+        return len(data)
+
+    def abort(self):
+        """
+        Descarta o upload sem criar o objeto.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._upload_id is not None:
+            self._client.abort_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id)
+            self._upload_id = None
+        self._buffer = bytearray()
+        super().close()
+
+    def close(self):
+        if self.closed:
+            return
+        if self._failed:
+            # O BufferedWriter chama `close` mesmo quando o flush final falha; não publica um objeto truncado
+            self.abort()
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(Bucket=self._bucket, Key=self._key, Body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                parts = [p.result() for p in self._parts]
+                self._client.complete_multipart_upload(
+                    Bucket=self._bucket, Key=self._key, UploadId=self._upload_id, MultipartUpload={"Parts": parts}
+                )
+                self._executor.shutdown(wait=True)
+        except Exception:
+            self.abort()
+            raise
+        super().close()
+
+
+class LocalAtomicWriter(io.FileIO):
+    """
+    Escritor de arquivo local que grava em um arquivo temporário e o renomeia no `close`, para que leitores
+    nunca vejam um arquivo parcial (mesma semântica do objeto S3, criado somente no final).
+    """
+
+    def __init__(self, path):
+        self._path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        super().__init__(f"{path}.tmp", "wb")
+        self._failed = False
+
+    def write(self, data):
+        try:
+            return super().write(data)
+        except BaseException:
+            self._failed = True
+            raise
+
+    def abort(self):
+        super().close()
+        if os.path.exists(self.name):
+            os.remove(self.name)
+
+    def close(self):
+        if self.closed:
+            return
+        if self._failed:
+            # Escrita incompleta (ex.: disco cheio no flush final): remove o temporário em vez de renomeá-lo
+            self.abort()
+            return
+        try:
+            super().close()
+            os.replace(self.name, self._path)
+        except BaseException:
+            self.abort()
+            raise
+
+
+@contextlib.contextmanager
+def open_uri(uri, mode="rb", encoding="utf-8"):
+    """
+    Abre um objeto S3 ou arquivo local como um arquivo sequencial, que pode ser passado diretamente para
+    pandas (read_csv, to_csv, read_json) ou NumPy. Leituras de S3 baixam intervalos em paralelo e escritas
+    usam multipart upload em paralelo, sem passar pelo disco local.
+
+    A escrita é atômica: o objeto ou arquivo só aparece quando o bloco `with` termina sem erro.
+
+    Args:
+        uri (str): URI S3, URI file:// ou caminho local.
+        mode (str, opcional): "rb", "wb", "r" ou "w".
+        encoding (str, opcional): Codificação nos modos texto.
+
+    Yields:
+        Arquivo binário bufferizado, ou de texto nos modos "r" e "w".
+    """
+    if mode not in ["rb", "wb", "r", "w"]:
+        raise ValueError(f"Modo não suportado: {mode}")
+    writing = mode.startswith("w")
+
+    if writing:
+        raw = S3MultipartWriter(uri) if is_s3(uri) else LocalAtomicWriter(local_path(uri))
+        f = io.BufferedWriter(raw, buffer_size=BUFFER_SIZE)
+    else:
+        raw = S3RangeReader(uri) if is_s3(uri) else io.FileIO(local_path(uri), "rb")
+        f = io.BufferedReader(raw, buffer_size=BUFFER_SIZE)
+
+    if "b" not in mode:
+        f = io.TextIOWrapper(f, encoding=encoding, newline="" if writing else None)
+
+    try:
+        yield f
+    except BaseException:
+        if writing:
+            # Descarta o upload antes de fechar, para que os dados restantes no buffer não sejam gravados
+            raw.abort()
+        with contextlib.suppress(Exception):
+            f.close()
+        raise
+    try:
+        f.close()
+    except BaseException:
+        # O flush final falhou: garante que nenhum objeto ou arquivo parcial seja publicado
+        if writing:
+            raw.abort()
+        raise
+
+
+def read_csv(uri, **kwargs):
+    """
+    Lê um CSV inteiro com `pandas.read_csv` por meio de `open_uri`. Para ler bloco a bloco (`chunksize`),
+    use `open_uri` diretamente e mantenha o arquivo aberto enquanto os blocos são consumidos.
+
+    Args:
+        uri (str): URI S3, URI file:// ou caminho local.
+        **kwargs: Argumentos de `pandas.read_csv`.
+
+    Returns:
+        pandas.DataFrame: Dados lidos.
+    """
+    if "chunksize" in kwargs or kwargs.get("iterator"):
+        raise ValueError("Para leitura em blocos, use open_uri diretamente")
+    with open_uri(uri) as f:
+        return pd.read_csv(f, **kwargs)
+
+
+def write_csv(df, uri, **kwargs):
+    """
+    Grava um DataFrame ou Series com `to_csv` por meio de `open_uri` (multipart upload em paralelo no S3).
+
+    Args:
+        df (pandas.DataFrame | pandas.Series): Dados a gravar.
+        uri (str): URI S3, URI file:// ou caminho local.
+        **kwargs: Argumentos de `to_csv`.
+
+    Returns:
+        str: URI de destino.
+    """
+    with open_uri(uri, "w") as f:
+        df.to_csv(f, **kwargs)
+    return uri